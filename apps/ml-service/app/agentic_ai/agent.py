@@ -1,21 +1,264 @@
+import asyncio
+import json
 import os
-from typing import Dict
+import re
+import time
+import pandas as pd
+from typing import Dict, List, Optional
+from app.agentic_ai.explanations import ExplanationStore, forecast_hash, render_prompt
 from app.agentic_ai.llm_client import LLMClient
+from app.agentic_ai.tools.forecast_tool import ForecastTool
+from app.agentic_ai.tools.data_analysis_tool import DataAnalysisTool
+from app.agentic_ai.tools.sales_cube import SalesCube
+from app.prompts.agent_prompts import AGENT_PLANNER_PROMPT, AGENT_ANSWER_PROMPT
+
+TOOL_DESCRIPTIONS = """- forecast(product_id: str, days: int): sales forecast for one product
+- sales_trends(grain: "day"|"week"|"month", by: "all"|"category"|"product", key: str): totals, regression slope, growth rate and weekly seasonality
+- top_products(n: int): best-selling products ranked by sales amount"""
 
 class SalesAIAgent:
     def __init__(self):
         self.llm_client = LLMClient()
-    
+        self.forecast_tool = ForecastTool()
+        self.analysis_tool = DataAnalysisTool()
+        # Long-lived aggregates of the sales history, fed by the SalesChangeConsumer
+        self.sales_cube = SalesCube()
+        # Explanations pre-generated by scripts/precompute-explanations.py (opt-in: needs MONGODB_URI)
+        self.explanations: Optional[ExplanationStore] = None
+        if os.getenv("AI_PRECOMPUTED_EXPLANATIONS", "false").lower() == "true":
+            self.explanations = ExplanationStore()
+        self.max_steps = int(os.getenv("AI_MAX_TOOL_STEPS", 3))
+        self.tool_timeout = float(os.getenv("AI_TOOL_TIMEOUT", 10))
+        self.max_forecast_days = int(os.getenv("AI_MAX_FORECAST_DAYS", 365))
+        self.context_token_budget = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", 1500))
+        self.tools = {
+            "forecast": self._forecast,
+            "sales_trends": self._sales_trends,
+            "top_products": self._top_products,
+        }
+
     async def process_query(self, query: str, context: Dict = {}) -> Dict:
         """Process a query using agentic AI"""
-        # Use open-source LLM (Ollama) for processing
+        sales = self._sales_frame(context)
+        deadline = time.monotonic() + self.tool_timeout
+        # Aggregate request sales once; every trend/top-N call then reads O(groups)
+        cube = await asyncio.to_thread(self._request_cube, sales)
+        results = []
+        for _ in range(self.max_steps):
+            calls = await self._plan(query, context, sales, results, deadline)
+            done = {self._call_key(r) for r in results}
+            calls = [c for c in calls if self._call_key(c) not in done]
+            if not calls or time.monotonic() >= deadline:
+                break
+            results.extend(await self._execute(calls, sales, cube, deadline))
+
+        if not results:
+            # Use open-source LLM (Ollama) for processing
+            response = await self.llm_client.generate(
+                prompt=query,
+                context=context
+            )
+            return {
+                "response": response,
+                "reasoning": "Generated using open-source LLM model"
+            }
+
         response = await self.llm_client.generate(
-            prompt=query,
+            prompt=AGENT_ANSWER_PROMPT.format(query=query, tool_results=self._compact(results)),
             context=context
         )
-        
+        used = ", ".join(sorted({r["tool"] for r in results}))
         return {
             "response": response,
-            "reasoning": "Generated using open-source LLM model"
+            "reasoning": f"Generated using open-source LLM model with {len(results)} tool calls ({used})"
+        }
+
+    async def explain_forecast(self, product_id: str, forecast_days: int = 30) -> Dict:
+        """Explain a product forecast, reusing a stored explanation when it is current"""
+        forecast = await self.forecast_tool.generate_forecast(product_id, forecast_days)
+        digest = forecast_hash(forecast, self.llm_client.model_name)
+        if self.explanations is not None:
+            stored = await self._stored_explanation(product_id)
+            if stored and stored.get("forecastHash") == digest:
+                return {"product_id": product_id, "explanation": stored["explanation"], "precomputed": True}
+        explanation = await self.llm_client.generate(prompt=render_prompt(product_id, forecast))
+        return {"product_id": product_id, "explanation": explanation, "precomputed": False}
+
+    async def _stored_explanation(self, product_id: str) -> Optional[Dict]:
+        try:
+            return await self.explanations.get(product_id)
+        except Exception:
+            # The store is a cache; fall back to generating on demand
+            return None
+
+    @staticmethod
+    def _sales_frame(context: Dict) -> Optional[pd.DataFrame]:
+        """Build a sales DataFrame from context records, if any were sent"""
+        records = context.get("sales")
+        if not records:
+            return None
+        return pd.DataFrame(records)
+
+    def _request_cube(self, sales: Optional[pd.DataFrame]) -> Optional[SalesCube]:
+        """Cube the tools read: the request's dated sales, else the long-lived history"""
+        if sales is None:
+            return self.sales_cube
+        if "saleDate" not in sales:
+            return None
+        cube = SalesCube()
+        cube.update(sales)
+        return cube
+
+    @staticmethod
+    def _call_key(call: Dict) -> str:
+        return json.dumps([call["tool"], call.get("args", {})], sort_keys=True, default=str)
+
+    async def _plan(self, query: str, context: Dict, sales: Optional[pd.DataFrame],
+                    results: List[Dict], deadline: float) -> List[Dict]:
+        """Ask the LLM for the next tool calls, falling back to a rule-based plan"""
+        product_ids = self._known_products(context, sales)
+        prompt = AGENT_PLANNER_PROMPT.format(
+            tools=TOOL_DESCRIPTIONS,
+            query=query,
+            product_ids=", ".join(product_ids[:50]) or "none",
+            tool_results=self._compact(results) if results else "none"
+        )
+        try:
+            # Planning shares the query's time budget with the tool calls
+            reply = await asyncio.wait_for(self.llm_client.generate(prompt=prompt, context=context),
+                                           timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            return self._fallback_plan(query, product_ids, sales, results)
+        calls = self._parse_calls(reply)
+        if calls is None:
+            return self._fallback_plan(query, product_ids, sales, results)
+        return calls
+
+    def _parse_calls(self, text: str) -> Optional[List[Dict]]:
+        """Extract a JSON list of tool calls from an LLM reply"""
+        match = re.search(r"\[.*\]", text, re.DOTALL)
+        if not match:
+            return None
+        try:
+            raw = json.loads(match.group(0))
+        except ValueError:
+            return None
+        if not isinstance(raw, list):
+            return None
+        return [
+            {"tool": c["tool"], "args": c.get("args") or {}}
+            for c in raw
+            if isinstance(c, dict) and c.get("tool") in self.tools
+        ]
+
+    def _known_products(self, context: Dict, sales: Optional[pd.DataFrame]) -> List[str]:
+        product_ids = [str(p) for p in context.get("product_ids", [])]
+        if sales is not None and "productId" in sales:
+            known = sales["productId"].astype(str).unique()
+        else:
+            known = self.sales_cube.cells["day"]["productId"].cat.categories
+        seen = set(product_ids)
+        product_ids += [p for p in known if p not in seen]
+        return product_ids
+
+    def _fallback_plan(self, query: str, product_ids: List[str], sales: Optional[pd.DataFrame],
+                       results: List[Dict]) -> List[Dict]:
+        """Rule-based planner used when the LLM does not return a usable plan"""
+        text = query.lower()
+        has_history = (sales is not None and "totalAmount" in sales) or len(self.sales_cube) > 0
+        days_match = re.search(r"(\d+)\s*days?", text)
+        days = int(days_match.group(1)) if days_match else 30
+
+        if not results:
+            calls = []
+            if has_history:
+                calls.append({"tool": "sales_trends", "args": {}})
+                top_match = re.search(r"top\s+(\d+)", text)
+                if top_match:
+                    calls.append({"tool": "top_products", "args": {"n": int(top_match.group(1))}})
+            mentioned = [p for p in product_ids if p.lower() in text]
+            if "forecast" in text and not mentioned and not has_history:
+                mentioned = product_ids
+            calls += [{"tool": "forecast", "args": {"product_id": p, "days": days}} for p in mentioned]
+            return calls
+
+        # Second step: forecast the products surfaced by top_products
+        forecasted = {r["args"].get("product_id") for r in results if r["tool"] == "forecast"}
+        calls = []
+        for r in results:
+            if r["tool"] == "top_products" and isinstance(r.get("result"), list):
+                for item in r["result"]:
+                    if item["product_id"] not in forecasted:
+                        calls.append({"tool": "forecast", "args": {"product_id": item["product_id"], "days": days}})
+        return calls
+
+    async def _execute(self, calls: List[Dict], sales: Optional[pd.DataFrame], cube: Optional[SalesCube],
+                       deadline: float) -> List[Dict]:
+        """Run independent tool calls concurrently within the remaining time budget"""
+        tasks = [asyncio.ensure_future(self.tools[c["tool"]](c.get("args", {}), sales, cube)) for c in calls]
+        done, pending = await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for call, task in zip(calls, tasks):
+            entry = {"tool": call["tool"], "args": call.get("args", {})}
+            if task in pending:
+                entry["error"] = "timed out"
+            elif task.exception() is not None:
+                entry["error"] = str(task.exception())
+            else:
+                entry["result"] = task.result()
+            results.append(entry)
+        return results
+
+    async def _forecast(self, args: Dict, sales: Optional[pd.DataFrame], cube: Optional[SalesCube]) -> Dict:
+        # Planner-supplied horizon; bound it so one call cannot run an arbitrarily long forecast
+        days = min(max(int(args.get("days", 30)), 1), self.max_forecast_days)
+        result = await self.forecast_tool.generate_forecast(str(args["product_id"]), days)
+        predictions = result["predictions"]
+        summary = {
+            "days": len(predictions),
+            "total": round(float(sum(predictions)), 2),
+            "mean": round(float(sum(predictions) / len(predictions)), 2) if predictions else 0.0,
+            "first": predictions[0] if predictions else None,
+            "last": predictions[-1] if predictions else None,
         }
+        if self.explanations is not None:
+            stored = await self._stored_explanation(str(args["product_id"]))
+            if stored and stored.get("forecastHash") == forecast_hash(result, self.llm_client.model_name):
+                summary["explanation"] = stored["explanation"]
+        return summary
+
+    async def _sales_trends(self, args: Dict, sales: Optional[pd.DataFrame], cube: Optional[SalesCube]) -> Dict:
+        if cube is None:
+            # Undated request sales: totals only
+            return await asyncio.to_thread(self.analysis_tool.analyze_sales_trends, sales)
+        if not len(cube):
+            raise ValueError("no sales history available")
+        return self.analysis_tool.analyze_cube_trends(
+            cube, args.get("grain", "day"), args.get("by", "all"), args.get("key")
+        )
+
+    async def _top_products(self, args: Dict, sales: Optional[pd.DataFrame], cube: Optional[SalesCube]) -> List[Dict]:
+        n = int(args.get("n", 10))
+        if cube is None:
+            return await asyncio.to_thread(self.analysis_tool.top_products, sales, n)
+        if not len(cube):
+            raise ValueError("no sales history available")
+        return self.analysis_tool.top_products_from_cube(cube, n)
 
+    def _compact(self, results: List[Dict]) -> str:
+        """Serialize tool results one per line, truncated to the context token budget"""
+        # Roughly 4 characters per token
+        budget = self.context_token_budget * 4
+        lines = []
+        used = 0
+        for i, r in enumerate(results):
+            line = json.dumps(r, separators=(",", ":"), default=str)
+            if used + len(line) > budget:
+                lines.append(f"... {len(results) - i} more tool results omitted")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
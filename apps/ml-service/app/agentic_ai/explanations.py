@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+import httpx
+from app.agentic_ai.llm_client import LLMClient
+from app.prompts.sales_prompts import FORECAST_EXPLANATION_PROMPT
+from app.utils.logger import setup_logger
+
+logger = setup_logger("explanations")
+
+ProgressCallback = Callable[[Dict], None]
+
+def forecast_hash(forecast: Dict, model_name: str = "") -> str:
+    """Fingerprint of a forecast and the prompt/model that would explain it"""
+    payload = json.dumps({
+        "predictions": [round(float(v), 2) for v in forecast["predictions"]],
+        "intervals": [[round(float(i["lower"]), 2), round(float(i["upper"]), 2)]
+                      for i in forecast.get("confidence_intervals", []) if i.get("lower") is not None],
+        "prompt": FORECAST_EXPLANATION_PROMPT,
+        "model": model_name,
+    }, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def render_prompt(product_id: str, forecast: Dict) -> str:
+    """Fill FORECAST_EXPLANATION_PROMPT for one product forecast"""
+    intervals = forecast.get("confidence_intervals", [])
+    return FORECAST_EXPLANATION_PROMPT.format(
+        product_id=product_id,
+        forecast_days=len(forecast["predictions"]),
+        predictions=[round(float(v), 1) for v in forecast["predictions"]],
+        confidence_intervals=[(round(float(i["lower"]), 1), round(float(i["upper"]), 1))
+                              for i in intervals if i.get("lower") is not None],
+    )
+
+def default_database():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/enterprise-sales-ai"),
+                                serverSelectionTimeoutMS=2000)
+    return client.get_default_database(os.getenv("MONGODB_DB_NAME", "enterprise-sales-ai"))
+
+class ExplanationStore:
+    """Generated forecast explanations in the ``forecast_explanations`` collection"""
+
+    def __init__(self, db=None, collection: str = "forecast_explanations"):
+        self.db = db
+        self.collection_name = collection
+
+    def _collection(self):
+        if self.db is None:
+            self.db = default_database()
+        return self.db[self.collection_name]
+
+    async def ensure_indexes(self) -> None:
+        await self._collection().create_index([("productId", 1)], unique=True)
+
+    async def get(self, product_id: str) -> Optional[Dict]:
+        """Stored explanation for a product, if one has been generated"""
+        return await self._collection().find_one({"productId": product_id}, {"_id": 0})
+
+    async def hashes(self, product_ids: List[str]) -> Dict[str, str]:
+        """Forecast hash each stored explanation was generated from"""
+        cursor = self._collection().find({"productId": {"$in": product_ids}}, {"productId": 1, "forecastHash": 1})
+        return {doc["productId"]: doc.get("forecastHash") async for doc in cursor}
+
+    async def save(self, product_id: str, explanation: str, forecast_hash_value: str,
+                   forecast_days: int, model_name: str) -> None:
+        await self._collection().update_one(
+            {"productId": product_id},
+            {"$set": {
+                "explanation": explanation,
+                "forecastHash": forecast_hash_value,
+                "forecastDays": forecast_days,
+                "model": model_name,
+                "generatedAt": datetime.datetime.now(datetime.timezone.utc),
+            }},
+            upsert=True
+        )
+
+class ExplanationPrecomputer:
+    """Pre-generate LLM explanations for the top-N products, skipping unchanged forecasts"""
+
+    def __init__(self, db=None, store: Optional[ExplanationStore] = None, llm_client: Optional[LLMClient] = None,
+                 concurrency: Optional[int] = None, forecasts_collection: str = "forecasts",
+                 sales_collection: str = "sales"):
+        self.db = db
+        self.store = store or ExplanationStore(db=db)
+        self.llm_client = llm_client
+        self.concurrency = concurrency or int(os.getenv("AI_EXPLANATION_CONCURRENCY", 4))
+        self.forecasts_collection = forecasts_collection
+        self.sales_collection = sales_collection
+
+    def _database(self):
+        if self.db is None:
+            self.db = default_database()
+        return self.db
+
+    async def top_products(self, n: int) -> List[str]:
+        """Best-selling product ids by total sales amount"""
+        pipeline = [
+            {"$unwind": "$items"},
+            {"$group": {"_id": "$items.productId", "total": {"$sum": "$items.totalPrice"}}},
+            {"$sort": {"total": -1}},
+            {"$limit": n},
+        ]
+        cursor = self._database()[self.sales_collection].aggregate(pipeline)
+        return [str(doc["_id"]) async for doc in cursor]
+
+    async def load_forecasts(self, product_ids: List[str]) -> Dict[str, Dict]:
+        """Latest stored forecast per product, in the predictor's result format"""
+        cursor = self._database()[self.forecasts_collection].find(
+            {"productId": {"$in": product_ids}}, {"productId": 1, "predicted": 1, "lower": 1, "upper": 1}
+        ).sort([("productId", 1), ("date", 1)])
+        forecasts: Dict[str, Dict] = {}
+        async for doc in cursor:
+            forecast = forecasts.setdefault(doc["productId"], {"predictions": [], "confidence_intervals": []})
+            forecast["predictions"].append(doc["predicted"])
+            forecast["confidence_intervals"].append({"lower": doc.get("lower"), "upper": doc.get("upper")})
+        return forecasts
+
+    async def run(self, top_n: int = 100, progress: Optional[ProgressCallback] = None) -> Dict:
+        """Explain the top-N products whose forecasts changed since the last run"""
+        await self.store.ensure_indexes()
+        product_ids = await self.top_products(top_n)
+        forecasts = await self.load_forecasts(product_ids)
+        stats = {"total": len(product_ids), "generated": 0, "skipped": 0, "failed": 0,
+                 "missing_forecast": len(product_ids) - len(forecasts)}
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits) as http_client:
+            llm = self.llm_client or LLMClient(http_client=http_client)
+            stored = await self.store.hashes(list(forecasts))
+            queue: asyncio.Queue = asyncio.Queue()
+            for product_id in product_ids:
+                if product_id not in forecasts:
+                    continue
+                digest = forecast_hash(forecasts[product_id], llm.model_name)
+                if stored.get(product_id) == digest:
+                    stats["skipped"] += 1
+                else:
+                    queue.put_nowait((product_id, digest))
+            if progress:
+                progress(dict(stats))
+
+            async def worker():
+                while not queue.empty():
+                    product_id, digest = queue.get_nowait()
+                    forecast = forecasts[product_id]
+                    try:
+                        explanation = await llm.complete(render_prompt(product_id, forecast))
+                        await self.store.save(product_id, explanation, digest,
+                                              len(forecast["predictions"]), llm.model_name)
+                        stats["generated"] += 1
+                    except Exception as e:
+                        # Left unsaved so the next run retries it
+                        stats["failed"] += 1
+                        logger.error(f"Explanation for {product_id} failed: {str(e)}")
+                    if progress:
+                        progress(dict(stats))
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        logger.info(f"Explanations: {stats['generated']} generated, {stats['skipped']} unchanged, "
+                    f"{stats['failed']} failed, {stats['missing_forecast']} without forecasts")
+        return stats
@@ -3,27 +3,28 @@ import os
 from typing import Dict, Optional
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.base_url = os.getenv("AI_MODEL_URL", "http://localhost:11434")
         self.model_name = os.getenv("AI_MODEL_NAME", "llama2")
+        # Optional shared client so batch jobs reuse pooled connections
+        self.http_client = http_client
+    
+    async def complete(self, prompt: str, timeout: float = 60.0) -> str:
+        """Generate a response, raising on connection or HTTP errors"""
+        payload = {"model": self.model_name, "prompt": prompt, "stream": False}
+        if self.http_client is not None:
+            response = await self.http_client.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("response", "No response generated")
     
     async def generate(self, prompt: str, context: Dict = {}) -> str:
         """Generate response using open-source LLM"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=60.0
-                )
-                if response.status_code == 200:
-                    return response.json().get("response", "No response generated")
-                else:
-                    return "Error generating response"
+            return await self.complete(prompt)
+        except httpx.HTTPStatusError:
+            return "Error generating response"
         except Exception as e:
             return f"Error connecting to AI model: {str(e)}"
-
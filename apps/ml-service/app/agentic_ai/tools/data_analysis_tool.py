@@ -1,16 +1,55 @@
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Optional
+from app.agentic_ai.tools.sales_cube import SalesCube
 
 class DataAnalysisTool:
     """Tool for analyzing sales data"""
     
     @staticmethod
-    def analyze_sales_trends(data: pd.DataFrame) -> Dict:
+    def analyze_sales_trends(data: pd.DataFrame, date_column: str = "saleDate") -> Dict:
         """Analyze sales trends"""
+        if date_column in data:
+            cube = SalesCube(date_column=date_column)
+            cube.update(data)
+            return DataAnalysisTool.analyze_cube_trends(cube)
         return {
             "total_sales": data["totalAmount"].sum(),
             "average_sale": data["totalAmount"].mean(),
             "transaction_count": len(data),
             "trend": "increasing" if data["totalAmount"].iloc[-1] > data["totalAmount"].iloc[0] else "decreasing"
         }
-
+    
+    @staticmethod
+    def analyze_cube_trends(cube: SalesCube, grain: str = "day", by: str = "all",
+                            key: Optional[str] = None) -> Dict:
+        """Analyze sales trends from precomputed aggregates"""
+        stats = cube.summary(grain, by, key)
+        if not stats:
+            return {"total_sales": 0.0, "average_sale": 0.0, "transaction_count": 0, "trend": "flat"}
+        count = int(stats["transaction_count"])
+        return {
+            **stats,
+            "transaction_count": count,
+            "average_sale": stats["total_sales"] / count if count else 0.0,
+            "trend": "increasing" if stats["slope"] > 0 else "decreasing" if stats["slope"] < 0 else "flat"
+        }
+    
+    @staticmethod
+    def top_products(data: pd.DataFrame, n: int = 10) -> List[Dict]:
+        """Rank products by total sales amount"""
+        totals = data.groupby("productId")["totalAmount"].agg(["sum", "count"])
+        top = totals.nlargest(n, "sum")
+        return [
+            {"product_id": str(product_id), "total_sales": float(row["sum"]), "transaction_count": int(row["count"])}
+            for product_id, row in top.iterrows()
+        ]
+    
+    @staticmethod
+    def top_products_from_cube(cube: SalesCube, n: int = 10) -> List[Dict]:
+        """Rank products by total sales amount from precomputed aggregates"""
+        totals = cube.series("month", "product").groupby("key", observed=True)[["amount", "count"]].sum()
+        top = totals.nlargest(n, "amount")
+        return [
+            {"product_id": str(product_id), "total_sales": float(row["amount"]), "transaction_count": int(row["count"])}
+            for product_id, row in top.iterrows()
+        ]
@@ -1,13 +1,13 @@
 from typing import Dict, List
-from app.inference.predictor import Predictor
+from app.inference.request_batcher import RequestBatcher
 
 class ForecastTool:
     """Tool for generating forecasts"""
     
     def __init__(self):
-        self.predictor = Predictor()
+        # Concurrent tool calls are coalesced into one batched model call
+        self.predictor = RequestBatcher()
     
     async def generate_forecast(self, product_id: str, days: int = 30) -> Dict:
         """Generate sales forecast"""
         return await self.predictor.predict_sales(product_id, days)
-
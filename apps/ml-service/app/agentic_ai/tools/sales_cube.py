@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+class SalesCube:
+    """Incrementally updated sales aggregates by day/week/month x product"""
+
+    GRAINS = ("day", "week", "month")
+
+    def __init__(self, date_column: str = "saleDate", amount_column: str = "totalAmount",
+                 product_column: str = "productId", category_column: str = "category",
+                 quantity_column: str = "quantity"):
+        self.date_column = date_column
+        self.amount_column = amount_column
+        self.product_column = product_column
+        self.category_column = category_column
+        self.quantity_column = quantity_column
+        # Product ids in first-seen order; a product's position is its code in every grain
+        self.products = pd.Index([], dtype=object)
+        # Per grain: cell keys (product code << 32 | period), sorted, and aligned value arrays
+        self._state: Dict[str, Dict[str, np.ndarray]] = {grain: self._empty() for grain in self.GRAINS}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self.categories: Dict[str, str] = {}
+
+    def reset(self) -> None:
+        """Drop all aggregates, keeping the column configuration"""
+        self.__init__(self.date_column, self.amount_column, self.product_column,
+                      self.category_column, self.quantity_column)
+
+    @staticmethod
+    def _empty() -> Dict[str, np.ndarray]:
+        return {
+            "key": np.array([], dtype=np.int64),
+            "amount": np.array([], dtype=np.float64),
+            "quantity": np.array([], dtype=np.float64),
+            "count": np.array([], dtype=np.int64),
+        }
+
+    @staticmethod
+    def to_period(days: np.ndarray, grain: str) -> np.ndarray:
+        """Convert days since epoch to a period index for the grain"""
+        if grain == "day":
+            return days
+        if grain == "week":
+            # 1970-01-01 was a Thursday; weeks start on Monday
+            return (days + 3) // 7
+        dates = days.astype("datetime64[D]")
+        years = dates.astype("datetime64[Y]").astype(np.int32)
+        months = dates.astype("datetime64[M]").astype(np.int32) - years * 12
+        return years * 12 + months
+
+    def __len__(self) -> int:
+        return int(self._state["day"]["count"].sum())
+
+    @property
+    def cells(self) -> Dict[str, pd.DataFrame]:
+        """One row per (product, period) per grain, with categorical product ids"""
+        for grain in self.GRAINS:
+            if grain not in self._frames:
+                state = self._state[grain]
+                self._frames[grain] = pd.DataFrame({
+                    "productId": pd.Categorical.from_codes((state["key"] >> 32).astype(np.int32),
+                                                           categories=self.products),
+                    "period": (state["key"] & 0xFFFFFFFF).astype(np.uint32).view(np.int32),
+                    "amount": state["amount"],
+                    "quantity": state["quantity"],
+                    "count": state["count"].astype(np.int32),
+                })
+        return self._frames
+
+    def _product_codes(self, products: pd.Series) -> np.ndarray:
+        """Stable integer codes for a batch of product ids, registering new ones"""
+        batch_codes, uniques = pd.factorize(products.astype(str))
+        uniques = pd.Index(uniques, dtype=object)
+        new = uniques[~uniques.isin(self.products)]
+        if len(new):
+            self.products = self.products.append(new)
+        return self.products.get_indexer(uniques)[batch_codes].astype(np.int64)
+
+    def update(self, data: pd.DataFrame) -> None:
+        """Fold a batch of sales rows into the cube, touching only its cells"""
+        if data.empty:
+            return
+        dates = pd.to_datetime(data[self.date_column]).to_numpy().astype("datetime64[D]")
+        days = dates.astype(np.int64)
+        codes = self._product_codes(data[self.product_column])
+        values = {"amount": data[self.amount_column].to_numpy(dtype=np.float64)}
+        if self.quantity_column in data:
+            values["quantity"] = data[self.quantity_column].to_numpy(dtype=np.float64)
+        else:
+            values["quantity"] = np.ones(len(data))
+        if self.category_column in data:
+            mapping = pd.Series(data[self.category_column].astype(str).to_numpy(),
+                                index=data[self.product_column].astype(str).to_numpy())
+            self.categories.update(mapping[~mapping.index.duplicated(keep="last")].to_dict())
+
+        for grain in self.GRAINS:
+            periods = self.to_period(days, grain).astype(np.int64) & 0xFFFFFFFF
+            keys, inverse = np.unique((codes << 32) | periods, return_inverse=True)
+            sums = {name: np.bincount(inverse, weights=v, minlength=len(keys)) for name, v in values.items()}
+            sums["count"] = np.bincount(inverse, minlength=len(keys))
+
+            state = self._state[grain]
+            position = np.searchsorted(state["key"], keys)
+            hit = position < len(state["key"])
+            hit[hit] = state["key"][position[hit]] == keys[hit]
+            for name in ("amount", "quantity", "count"):
+                state[name][position[hit]] += sums[name][hit]
+            new = ~hit
+            if new.any():
+                state["key"] = np.insert(state["key"], position[new], keys[new])
+                for name in ("amount", "quantity", "count"):
+                    state[name] = np.insert(state[name], position[new], sums[name][new])
+        self._frames = {}
+
+    def series(self, grain: str = "day", by: str = "product") -> pd.DataFrame:
+        """Aggregated (key, period) rows for product, category or all"""
+        if grain not in self.GRAINS:
+            raise ValueError(f"Unknown grain: {grain}")
+        cells = self.cells[grain]
+        if by == "product":
+            return cells.rename(columns={"productId": "key"})
+        if by == "category":
+            keys = cells["productId"].astype(str).map(self.categories).fillna("unknown")
+        elif by == "all":
+            keys = pd.Series("all", index=cells.index)
+        else:
+            raise ValueError(f"Unknown dimension: {by}")
+        grouped = cells.drop(columns="productId").assign(key=keys.to_numpy())
+        return grouped.groupby(["key", "period"], as_index=False).sum()
+
+    def trend_stats(self, grain: str = "day", by: str = "all") -> pd.DataFrame:
+        """Trend statistics per key, with missing periods counted as zero sales"""
+        rows = self.series(grain, by)
+        if rows.empty:
+            return pd.DataFrame(columns=["periods", "total_sales", "average_per_period", "transaction_count",
+                                         "slope", "slope_pct", "growth_rate", "seasonality_strength"])
+        last = int(rows["period"].max())
+        first = rows.groupby("key")["period"].min()
+        x = rows["period"].to_numpy() - rows["key"].map(first).to_numpy()
+        sums = rows.assign(xy=x * rows["amount"].to_numpy()).groupby("key").agg(
+            total_sales=("amount", "sum"), xy=("xy", "sum"), transaction_count=("count", "sum")
+        )
+
+        # Closed-form regression over x = 0..n-1 with zero-filled gaps
+        n = (last - first + 1).astype(np.float64)
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denominator = n * sum_xx - sum_x ** 2
+        slope = np.where(denominator > 0, (n * sums["xy"] - sum_x * sums["total_sales"]) / np.where(denominator > 0, denominator, 1), 0.0)
+        mean = sums["total_sales"] / n
+
+        by_period = rows.set_index(["key", "period"])["amount"]
+        keys = sums.index
+        current = by_period.reindex(list(zip(keys, [last] * len(keys)))).fillna(0.0).to_numpy()
+        previous = by_period.reindex(list(zip(keys, [last - 1] * len(keys)))).fillna(0.0).to_numpy()
+        growth = np.where(previous > 0, (current - previous) / np.where(previous > 0, previous, 1), np.nan)
+
+        stats = pd.DataFrame({
+            "periods": n.astype(np.int32),
+            "total_sales": sums["total_sales"],
+            "average_per_period": mean,
+            "transaction_count": sums["transaction_count"],
+            "slope": slope,
+            "slope_pct": np.where(mean > 0, slope / mean.where(mean > 0, 1), 0.0),
+            "growth_rate": growth,
+        }, index=keys)
+        stats["seasonality_strength"] = self._weekly_seasonality(by).reindex(keys)
+        return stats
+
+    def _weekly_seasonality(self, by: str) -> pd.Series:
+        """Variance of day-of-week means over total daily variance, per key"""
+        days = self.series("day", by)
+        if days.empty:
+            return pd.Series(dtype=np.float64)
+        days = days.assign(dow=(days["period"].to_numpy() + 3) % 7)
+        total_var = days.groupby("key")["amount"].var(ddof=0)
+        dow_var = days.groupby(["key", "dow"])["amount"].mean().groupby(level="key").var(ddof=0)
+        return (dow_var / total_var.where(total_var > 0)).clip(upper=1.0)
+
+    def summary(self, grain: str = "day", by: str = "all", key: Optional[str] = None) -> Dict:
+        """Trend statistics for one key as a plain dict"""
+        stats = self.trend_stats(grain, by)
+        if stats.empty:
+            return {}
+        key = key if key is not None else stats.index[0]
+        if key not in stats.index:
+            raise KeyError(f"No sales for {by} {key}")
+        row = stats.loc[key]
+        return {
+            "key": str(key),
+            "grain": grain,
+            **{name: (None if pd.isna(value) else float(value)) for name, value in row.items()},
+        }
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """Aggregates as plain arrays, for embedding in checkpoints"""
+        state = {
+            "columns": np.array([self.date_column, self.amount_column, self.product_column,
+                                 self.category_column, self.quantity_column]),
+            "products": np.array(self.products.tolist(), dtype=str),
+            "category_products": np.array(list(self.categories), dtype=str),
+            "category_names": np.array(list(self.categories.values()), dtype=str),
+        }
+        for grain in self.GRAINS:
+            state.update({f"{grain}_{name}": values for name, values in self._state[grain].items()})
+        return state
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, np.ndarray]) -> "SalesCube":
+        """Rebuild a cube from ``state_dict`` arrays"""
+        cube = cls(*[str(column) for column in state["columns"]])
+        cube.products = pd.Index([str(p) for p in state["products"]], dtype=object)
+        cube.categories = dict(zip(state["category_products"].tolist(), state["category_names"].tolist()))
+        for grain in cls.GRAINS:
+            cube._state[grain] = {name: np.asarray(state[f"{grain}_{name}"]) for name in cls._empty()}
+        return cube
+
+    def save(self, path: str) -> None:
+        """Save aggregates as a compressed NumPy archive"""
+        np.savez_compressed(path, **self.state_dict())
+
+    @classmethod
+    def load(cls, path: str) -> "SalesCube":
+        """Load aggregates saved with ``save``"""
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls.from_state_dict({name: artifact[name] for name in artifact.files})
@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+@dataclass
+class PoolConfig:
+    """Limits for one class of requests; lower priority values are served first"""
+    limit: int
+    max_queue: int
+    queue_timeout: float
+    priority: int
+
+    @classmethod
+    def from_env(cls, name: str, limit: int, max_queue: int, queue_timeout: float, priority: int) -> "PoolConfig":
+        prefix = f"ADMISSION_{name.upper()}"
+        return cls(
+            limit=int(os.getenv(f"{prefix}_LIMIT", limit)),
+            max_queue=int(os.getenv(f"{prefix}_QUEUE", max_queue)),
+            queue_timeout=float(os.getenv(f"{prefix}_TIMEOUT", queue_timeout)),
+            priority=priority,
+        )
+
+@dataclass
+class PoolState:
+    config: PoolConfig
+    active: int = 0
+    queued: int = 0
+    admitted: int = 0
+    shed: int = 0
+    # EWMA of time between admission and release, used to predict queue waits
+    service_time: float = 0.05
+    shed_reasons: Dict[str, int] = field(default_factory=dict)
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of queued"""
+
+    def __init__(self, pool: str, reason: str, retry_after: float):
+        super().__init__(f"{pool} overloaded: {reason}")
+        self.pool = pool
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Per-pool concurrency limits with bounded, deadline-aware queues under a shared cap"""
+
+    def __init__(self, pools: Dict[str, PoolConfig], total_limit: Optional[int] = None):
+        self.pools = {name: PoolState(config) for name, config in pools.items()}
+        self.total_limit = total_limit or int(os.getenv("ADMISSION_TOTAL_LIMIT", 64))
+        self.active = 0
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def _has_room(self, name: str) -> bool:
+        pool = self.pools[name]
+        return self.active < self.total_limit and pool.active < pool.config.limit
+
+    def _admit(self, name: str) -> float:
+        self.active += 1
+        pool = self.pools[name]
+        pool.active += 1
+        pool.admitted += 1
+        return time.monotonic()
+
+    def _shed(self, name: str, reason: str, wait: float) -> Overloaded:
+        pool = self.pools[name]
+        pool.shed += 1
+        pool.shed_reasons[reason] = pool.shed_reasons.get(reason, 0) + 1
+        return Overloaded(name, reason, retry_after=max(1.0, math.ceil(wait)))
+
+    def _predicted_wait(self, name: str) -> float:
+        pool = self.pools[name]
+        ahead = pool.queued + sum(1 for w in self._waiters if w[0] < pool.config.priority)
+        return (ahead + 1) * pool.service_time / max(pool.config.limit, 1)
+
+    async def acquire(self, name: str) -> float:
+        """Wait for a slot in the pool; returns the admission timestamp"""
+        pool = self.pools[name]
+        blocked = any(w[0] <= pool.config.priority for w in self._waiters)
+        if self._has_room(name) and not blocked:
+            return self._admit(name)
+
+        wait = self._predicted_wait(name)
+        if pool.queued >= pool.config.max_queue:
+            raise self._shed(name, "queue_full", wait)
+        if wait > pool.config.queue_timeout:
+            raise self._shed(name, "deadline", wait)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (pool.config.priority, next(self._sequence), name, future)
+        self._waiters.append(waiter)
+        pool.queued += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), pool.config.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Admitted in the same tick the deadline passed
+                return future.result()
+            self._waiters.remove(waiter)
+            pool.queued -= 1
+            raise self._shed(name, "timeout", pool.config.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued: drop the waiter or give the slot back
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                pool.queued -= 1
+            elif future.done():
+                self.release(name, future.result())
+            raise
+
+    def release(self, name: str, admitted_at: float) -> None:
+        """Free a slot and hand it to the highest-priority waiter that fits"""
+        pool = self.pools[name]
+        pool.active -= 1
+        self.active -= 1
+        elapsed = time.monotonic() - admitted_at
+        pool.service_time = 0.8 * pool.service_time + 0.2 * elapsed
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for waiter in sorted(self._waiters):
+            if self.active >= self.total_limit:
+                break
+            _, _, name, future = waiter
+            if future.done() or not self._has_room(name):
+                continue
+            self._waiters.remove(waiter)
+            self.pools[name].queued -= 1
+            future.set_result(self._admit(name))
+
+    def metrics(self) -> Dict:
+        """Queue depth, in-flight and shed counts per pool"""
+        return {
+            "active": self.active,
+            "total_limit": self.total_limit,
+            "pools": {
+                name: {
+                    "active": pool.active,
+                    "limit": pool.config.limit,
+                    "queue_depth": pool.queued,
+                    "max_queue": pool.config.max_queue,
+                    "admitted": pool.admitted,
+                    "shed": pool.shed,
+                    "shed_reasons": dict(pool.shed_reasons),
+                    "service_time_ms": round(pool.service_time * 1000, 2),
+                }
+                for name, pool in self.pools.items()
+            },
+        }
+
+class AdmissionMiddleware:
+    """ASGI middleware mapping path prefixes to admission pools"""
+
+    def __init__(self, app, controller: AdmissionController, routes: List[Tuple[str, str]]):
+        self.app = app
+        self.controller = controller
+        self.routes = routes
+
+    def _pool_for(self, path: str) -> Optional[str]:
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return name
+        return None
+
+    async def __call__(self, scope, receive, send):
+        name = self._pool_for(scope.get("path", "")) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            admitted_at = await self.controller.acquire(name)
+        except Overloaded as e:
+            body = json.dumps({"detail": str(e), "reason": e.reason}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(int(e.retry_after)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name, admitted_at)
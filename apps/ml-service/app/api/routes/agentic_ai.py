@@ -24,3 +24,11 @@ async def query_ai(request: AIRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/explanations/{product_id}")
+async def explain_forecast(product_id: str, forecast_days: int = 30):
+    """Forecast explanation, served from the precomputed store when current"""
+    try:
+        return await agent.explain_forecast(product_id, forecast_days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
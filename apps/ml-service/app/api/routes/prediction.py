@@ -1,14 +1,23 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas.prediction_schemas import PredictionRequest, PredictionResponse
-from app.inference.predictor import Predictor
+import numpy as np
+from app.schemas.prediction_schemas import (
+    PredictionRequest, PredictionResponse, ReplenishmentRequest, ReplenishmentResponse, ReplenishmentPlan,
+    AnomalyRequest, AnomalyResponse, AnomalyResult
+)
+from app.inference.request_batcher import RequestBatcher
+from app.inference.replenishment import ReplenishmentOptimizer
+from app.preprocessing.anomaly_detector import StreamingAnomalyDetector
 
 router = APIRouter()
-predictor = Predictor()
+# Concurrent forecast calls are coalesced into batched model calls
+batcher = RequestBatcher()
+optimizer = ReplenishmentOptimizer()
+anomaly_detector = StreamingAnomalyDetector()
 
 @router.post("/forecast", response_model=PredictionResponse)
 async def forecast_sales(request: PredictionRequest):
     try:
-        result = await predictor.predict_sales(
+        result = await batcher.predict_sales(
             product_id=request.product_id,
             forecast_days=request.forecast_days
         )
@@ -21,3 +30,61 @@ async def forecast_sales(request: PredictionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/replenishment", response_model=ReplenishmentResponse)
+async def replenishment_plan(request: ReplenishmentRequest):
+    try:
+        items = request.items
+        if not items:
+            return ReplenishmentResponse(plans=[], total_order_cost=0.0)
+        horizon = max(item.lead_time_days for item in items) + request.review_period_days
+        # One batched model call for the whole catalog
+        forecast, lower, upper, trained = await batcher.predictor.predict_arrays(
+            [item.product_id for item in items], horizon
+        )
+        # Never plan orders from the placeholder forecast of a product without a model
+        untrained = [item.product_id for item, ok in zip(items, trained.tolist()) if not ok]
+        items = [item for item, ok in zip(items, trained.tolist()) if ok]
+        if not items:
+            return ReplenishmentResponse(plans=[], total_order_cost=0.0, untrained_product_ids=untrained)
+        forecast, lower, upper = forecast[trained], lower[trained], upper[trained]
+        lead_time = np.array([item.lead_time_days for item in items])
+
+        plan = optimizer.plan(
+            forecast, lower, upper,
+            current_stock=np.array([item.current_stock for item in items]),
+            lead_time_days=lead_time,
+            unit_cost=np.array([item.unit_cost for item in items]),
+            sale_price=np.array([item.sale_price for item in items]),
+            on_order=np.array([item.on_order for item in items]),
+            review_period_days=request.review_period_days,
+            service_level=request.service_level,
+            interval_level=batcher.predictor.interval_width
+        )
+        columns = {name: values.tolist() for name, values in plan.items()}
+        plans = [
+            ReplenishmentPlan(product_id=item.product_id, **{name: values[i] for name, values in columns.items()})
+            for i, item in enumerate(items)
+        ]
+        return ReplenishmentResponse(plans=plans, total_order_cost=float(plan["order_cost"].sum()),
+                                     untrained_product_ids=untrained)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/anomalies", response_model=AnomalyResponse)
+async def detect_anomalies(request: AnomalyRequest):
+    """Score incoming daily sales and update per-product state"""
+    try:
+        observations = request.observations
+        scores, flags = anomaly_detector.update(
+            [o.product_id for o in observations],
+            [o.value for o in observations],
+            [np.nan if o.expected is None else o.expected for o in observations]
+        )
+        results = [
+            AnomalyResult(product_id=o.product_id, value=o.value, score=score, is_anomaly=flag)
+            for o, score, flag in zip(observations, scores.tolist(), flags.tolist())
+        ]
+        return AnomalyResponse(results=results, anomaly_count=int(flags.sum()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
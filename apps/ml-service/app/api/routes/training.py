@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas.training_schemas import TrainingRequest, TrainingResponse
 from app.training.trainer import Trainer
 
@@ -10,7 +10,8 @@ async def train_model(request: TrainingRequest):
     try:
         result = await trainer.train_model(
             model_type=request.model_type,
-            data_path=request.data_path
+            data_path=request.data_path,
+            product_ids=request.product_ids
         )
         return TrainingResponse(
             model_type=request.model_type,
@@ -21,3 +22,12 @@ async def train_model(request: TrainingRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/pending-refits")
+async def pending_refits(request: Request, drain: bool = False):
+    """Products touched by new sales since the last drain"""
+    consumer = getattr(request.app.state, "sales_consumer", None)
+    if consumer is None:
+        raise HTTPException(status_code=404, detail="Sales consumer is not enabled")
+    products = consumer.drain_refits() if drain else sorted(consumer.pending_refits)
+    return {"product_ids": products, "count": len(products)}
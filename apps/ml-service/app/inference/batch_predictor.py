@@ -1,17 +1,36 @@
-from typing import List, Dict
+import datetime
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Union
 from app.inference.predictor import Predictor
 
 class BatchPredictor:
     """Batch prediction for multiple products"""
     
-    def __init__(self):
+    def __init__(self, chunk_size: int = 1000):
         self.predictor = Predictor()
+        self.chunk_size = chunk_size
     
-    async def predict_batch(self, product_ids: List[str], forecast_days: int = 30) -> Dict:
+    async def predict_batch(self, product_ids: List[str], forecast_days: int = 30,
+                            start_date: Optional[datetime.date] = None) -> Dict:
         """Predict for multiple products"""
-        results = {}
-        for product_id in product_ids:
-            result = await self.predictor.predict_sales(product_id, forecast_days)
-            results[product_id] = result
-        return results
-
+        results = await self.predictor.predict_sales_batch([(p, forecast_days) for p in product_ids], start_date)
+        return dict(zip(product_ids, results))
+    
+    async def iter_batches(self, product_ids: Union[Iterable[str], AsyncIterable[str]],
+                           forecast_days: int = 30,
+                           start_date: Optional[datetime.date] = None) -> AsyncIterator[Dict]:
+        """Stream predictions in chunks so memory stays flat for any catalog size"""
+        chunk = []
+        if hasattr(product_ids, "__aiter__"):
+            async for product_id in product_ids:
+                chunk.append(product_id)
+                if len(chunk) >= self.chunk_size:
+                    yield await self.predict_batch(chunk, forecast_days, start_date)
+                    chunk = []
+        else:
+            for product_id in product_ids:
+                chunk.append(product_id)
+                if len(chunk) >= self.chunk_size:
+                    yield await self.predict_batch(chunk, forecast_days, start_date)
+                    chunk = []
+        if chunk:
+            yield await self.predict_batch(chunk, forecast_days, start_date)
@@ -0,0 +1,93 @@
+import datetime
+import os
+import uuid
+from typing import AsyncIterator, Dict, Optional
+from app.inference.batch_predictor import BatchPredictor
+from app.utils.helpers import generate_date_range
+from app.utils.logger import setup_logger
+
+logger = setup_logger("forecast_store")
+
+class ForecastStore:
+    """Score the whole catalog and upsert daily forecasts into MongoDB"""
+
+    def __init__(self, db=None, collection: str = "forecasts", products_collection: str = "products",
+                 batch_predictor: Optional[BatchPredictor] = None, write_batch_size: int = 5000):
+        self.db = db
+        self.collection_name = collection
+        self.products_collection = products_collection
+        self.batch_predictor = batch_predictor or BatchPredictor()
+        self.write_batch_size = write_batch_size
+
+    def _database(self):
+        if self.db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/enterprise-sales-ai"))
+            self.db = client.get_default_database(os.getenv("MONGODB_DB_NAME", "enterprise-sales-ai"))
+        return self.db
+
+    async def ensure_indexes(self) -> None:
+        """Create the (productId, date) lookup index"""
+        collection = self._database()[self.collection_name]
+        await collection.create_index([("productId", 1), ("date", 1)], unique=True)
+        await collection.create_index([("runId", 1)])
+
+    async def _product_ids(self) -> AsyncIterator[str]:
+        cursor = self._database()[self.products_collection].find({}, {"_id": 1})
+        async for doc in cursor.batch_size(self.batch_predictor.chunk_size):
+            yield str(doc["_id"])
+
+    async def write_chunk(self, results: Dict[str, Dict], start_date: datetime.date,
+                          run_id: str, generated_at: datetime.datetime) -> int:
+        """Upsert one chunk of product forecasts; returns the number of points written"""
+        from pymongo import DeleteMany, UpdateOne
+
+        collection = self._database()[self.collection_name]
+        operations = []
+        written = 0
+        for product_id, result in results.items():
+            if not result.get("trained", True):
+                # No model: the prediction is a placeholder, so the product gets no forecast documents
+                continue
+            intervals = result.get("confidence_intervals", [])
+            dates = generate_date_range(start_date, len(result["predictions"]))
+            for i, (date, value) in enumerate(zip(dates, result["predictions"])):
+                interval = intervals[i] if i < len(intervals) else {}
+                operations.append(UpdateOne(
+                    {"productId": product_id, "date": datetime.datetime.combine(date, datetime.time())},
+                    {"$set": {
+                        "predicted": float(value),
+                        "lower": interval.get("lower"),
+                        "upper": interval.get("upper"),
+                        "runId": run_id,
+                        "generatedAt": generated_at,
+                    }},
+                    upsert=True
+                ))
+                if len(operations) >= self.write_batch_size:
+                    await collection.bulk_write(operations, ordered=False)
+                    written += len(operations)
+                    operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+        # Drop points from earlier runs that this run no longer covers (e.g. a shorter horizon or no model)
+        await collection.bulk_write(
+            [DeleteMany({"productId": {"$in": list(results)}, "runId": {"$ne": run_id}})], ordered=False
+        )
+        return written
+
+    async def run(self, forecast_days: int = 30, start_date: Optional[datetime.date] = None) -> Dict:
+        """Forecast every product in the catalog and write the results"""
+        await self.ensure_indexes()
+        run_id = uuid.uuid4().hex
+        generated_at = datetime.datetime.now(datetime.timezone.utc)
+        start_date = start_date or generated_at.date() + datetime.timedelta(days=1)
+        products = points = untrained = 0
+        async for results in self.batch_predictor.iter_batches(self._product_ids(), forecast_days, start_date):
+            points += await self.write_chunk(results, start_date, run_id, generated_at)
+            skipped = sum(not result.get("trained", True) for result in results.values())
+            products += len(results) - skipped
+            untrained += skipped
+            logger.info(f"Wrote forecasts for {products} products ({points} points, {untrained} without a model)")
+        return {"run_id": run_id, "products": products, "points": points, "untrained": untrained}
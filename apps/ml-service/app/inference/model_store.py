@@ -0,0 +1,56 @@
+import os
+import threading
+from typing import Optional
+from app.models.prophet_model import ProphetModel
+
+class ModelStore:
+    """Serving models shared by every Predictor, reloaded when the artifact changes"""
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or os.getenv("ML_MODEL_PATH", "./saved_models")
+        self.prophet_path = os.path.join(self.model_path, "prophet_model.json")
+        self._prophet: Optional[ProphetModel] = None
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def prophet(self) -> Optional[ProphetModel]:
+        """Current Prophet model, or None before one has been trained"""
+        try:
+            mtime = os.stat(self.prophet_path).st_mtime_ns
+        except FileNotFoundError:
+            return self._prophet
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    model = ProphetModel()
+                    model.load(self.prophet_path)
+                    model.start_workers()
+                    previous, self._prophet, self._mtime = self._prophet, model, mtime
+                    if previous is not None:
+                        # Forecasts already submitted to the old pool still finish
+                        previous.close()
+        return self._prophet
+
+    def reload(self) -> None:
+        """Load the artifact again now, e.g. right after a training run saved it"""
+        self._mtime = None
+        self.prophet()
+
+    def close(self) -> None:
+        """Shut down model worker pools"""
+        if self._prophet is not None:
+            self._prophet.close()
+
+_shared: Optional[ModelStore] = None
+
+def shared_model_store() -> ModelStore:
+    """The process-wide model store"""
+    global _shared
+    if _shared is None:
+        _shared = ModelStore()
+    return _shared
+
+def reload_served(path: str) -> None:
+    """Reload the shared store now if it serves the artifact just saved at ``path``"""
+    if _shared is not None and os.path.abspath(_shared.prophet_path) == os.path.abspath(path):
+        _shared.reload()
@@ -1,25 +1,71 @@
-import os
-from typing import Dict, List
+import asyncio
+import datetime
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from app.inference.model_store import ModelStore, shared_model_store
 from app.models.prophet_model import ProphetModel
 from app.models.xgboost_model import XGBoostModel
 
 class Predictor:
-    def __init__(self):
-        self.model_path = os.getenv("ML_MODEL_PATH", "./saved_models")
-        self.prophet_model = ProphetModel()
+    def __init__(self, models: Optional[ModelStore] = None):
+        # Shared across predictors and reloaded after training saves a new artifact
+        self.models = models or shared_model_store()
         self.xgboost_model = XGBoostModel()
-    
+
     async def predict_sales(self, product_id: str, forecast_days: int = 30) -> Dict:
         """Predict sales for a product"""
-        # Load model and make predictions
-        # This is a placeholder - implement actual prediction logic
-        predictions = [100 + i * 2 for i in range(forecast_days)]
-        confidence_intervals = [
-            {"lower": p * 0.9, "upper": p * 1.1} for p in predictions
-        ]
-        
-        return {
-            "predictions": predictions,
-            "confidence_intervals": confidence_intervals
-        }
+        results = await self.predict_sales_batch([(product_id, forecast_days)])
+        return results[0]
+
+    @property
+    def interval_width(self) -> float:
+        """Coverage of the confidence intervals returned for trained products"""
+        model = self.models.prophet()
+        return model.interval_width if model is not None else ProphetModel().interval_width
+
+    async def predict_arrays(self, product_ids: List[str], forecast_days: int,
+                             start_date: Optional[datetime.date] = None
+                             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(products x days) predictions and bounds from ``start_date`` (default tomorrow), and a trained-model mask"""
+        # Placeholder for products without a trained model
+        steps = np.arange(forecast_days, dtype=np.float64)
+        predictions = np.broadcast_to(100 + steps * 2, (len(product_ids), forecast_days))
+        predictions, lower, upper = predictions.copy(), predictions * 0.9, predictions * 1.1
+
+        # CPU-bound (and pooled across processes for many products): keep it off the event loop
+        rows, fitted = await asyncio.to_thread(self._predict_prophet, product_ids, forecast_days, start_date)
+        for target, values in zip((predictions, lower, upper), fitted):
+            target[rows] = values
+        trained = np.zeros(len(product_ids), dtype=bool)
+        trained[rows] = True
+        return predictions, lower, upper, trained
+
+    def _predict_prophet(self, product_ids: List[str], forecast_days: int,
+                         start_date: Optional[datetime.date] = None) -> Tuple[List[int], Tuple]:
+        """Rows with a Prophet model and their (predictions, lower, upper)"""
+        model = self.models.prophet()
+        rows = [i for i, p in enumerate(product_ids) if model is not None and p in model.model]
+        if not rows:
+            return rows, ()
+        return rows, model.predict_batch([product_ids[i] for i in rows], forecast_days, start_date)
+
+    async def predict_sales_batch(self, requests: List[Tuple[str, int]],
+                                  start_date: Optional[datetime.date] = None) -> List[Dict]:
+        """Predict sales for many (product_id, forecast_days) pairs in one model call"""
+        if not requests:
+            return []
+        horizon = max(days for _, days in requests)
+        predictions, lower, upper, trained = await self.predict_arrays([p for p, _ in requests], horizon, start_date)
 
+        results = []
+        for row, (_, forecast_days) in enumerate(requests):
+            results.append({
+                "predictions": predictions[row, :forecast_days].tolist(),
+                # False when the values are the placeholder for a product without a model
+                "trained": bool(trained[row]),
+                "confidence_intervals": [
+                    {"lower": lo, "upper": hi}
+                    for lo, hi in zip(lower[row, :forecast_days].tolist(), upper[row, :forecast_days].tolist())
+                ]
+            })
+        return results
@@ -0,0 +1,65 @@
+import numpy as np
+from scipy.special import ndtri
+from typing import Dict, Optional
+
+class ReplenishmentOptimizer:
+    """Vectorized (s, S) reorder planning over the whole catalog"""
+
+    def __init__(self, holding_cost_rate: float = 0.25, interval_level: float = 0.8):
+        # Annual holding cost as a fraction of unit cost
+        self.holding_cost_rate = holding_cost_rate
+        # Coverage of the forecast confidence intervals, used to recover the daily std
+        self.interval_level = interval_level
+
+    @staticmethod
+    def _horizon_sum(daily: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """Sum of the first ``days`` columns of each row"""
+        cumulative = np.concatenate([np.zeros((daily.shape[0], 1)), np.cumsum(daily, axis=1)], axis=1)
+        return cumulative[np.arange(daily.shape[0]), np.clip(days, 0, daily.shape[1])]
+
+    def plan(self, forecast: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+             current_stock: np.ndarray, lead_time_days: np.ndarray, unit_cost: np.ndarray,
+             sale_price: np.ndarray, on_order: Optional[np.ndarray] = None,
+             review_period_days: int = 7, service_level: Optional[float] = None,
+             interval_level: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Reorder point, safety stock and order quantity per product"""
+        forecast = np.asarray(forecast, dtype=np.float64)
+        lead_time = np.asarray(lead_time_days, dtype=np.int64)
+        stock = np.asarray(current_stock, dtype=np.float64)
+        cost = np.asarray(unit_cost, dtype=np.float64)
+        price = np.asarray(sale_price, dtype=np.float64)
+        position = stock + (np.asarray(on_order, dtype=np.float64) if on_order is not None else 0.0)
+
+        z_interval = ndtri(0.5 + (interval_level or self.interval_level) / 2)
+        daily_std = np.maximum(np.asarray(upper) - np.asarray(lower), 0.0) / (2 * z_interval)
+
+        if service_level is None:
+            underage = np.maximum(price - cost, 0.0)
+            overage = cost * self.holding_cost_rate * (lead_time + review_period_days) / 365.0
+            ratio = underage / np.maximum(underage + overage, 1e-12)
+        else:
+            ratio = np.full(len(stock), service_level)
+        # Report the service level actually planned for, not the raw critical ratio
+        ratio = np.clip(ratio, 0.5, 0.999)
+        z = ndtri(ratio)
+
+        protection = lead_time + review_period_days
+        lead_demand = self._horizon_sum(forecast, lead_time)
+        lead_std = np.sqrt(self._horizon_sum(daily_std ** 2, lead_time))
+        cover_demand = self._horizon_sum(forecast, protection)
+        cover_std = np.sqrt(self._horizon_sum(daily_std ** 2, protection))
+
+        safety_stock = z * lead_std
+        reorder_point = lead_demand + safety_stock
+        order_up_to = cover_demand + z * cover_std
+        needs_order = position <= reorder_point
+        order_quantity = np.where(needs_order, np.ceil(np.maximum(order_up_to - position, 0.0)), 0.0)
+        return {
+            "service_level": ratio,
+            "safety_stock": safety_stock,
+            "reorder_point": reorder_point,
+            "order_up_to": order_up_to,
+            "order_quantity": order_quantity,
+            "needs_order": needs_order,
+            "order_cost": order_quantity * cost,
+        }
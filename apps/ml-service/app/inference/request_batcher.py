@@ -0,0 +1,80 @@
+import asyncio
+import os
+from typing import Dict, List, Optional, Set, Tuple
+from app.inference.predictor import Predictor
+
+RequestKey = Tuple[str, int]
+
+class RequestBatcher:
+    """Coalesce concurrent forecast requests into batched model calls"""
+
+    def __init__(self, predictor: Optional[Predictor] = None,
+                 max_batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[float] = None):
+        self.predictor = predictor or Predictor()
+        self.max_batch_size = max_batch_size or int(os.getenv("FORECAST_BATCH_SIZE", 64))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("FORECAST_BATCH_WAIT_MS", 5))
+        self.max_wait = max_wait_ms / 1000.0
+        self._in_flight: Dict[RequestKey, asyncio.Future] = {}
+        self._queue: List[RequestKey] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references so running flushes are not garbage-collected
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def predict_sales(self, product_id: str, forecast_days: int = 30) -> Dict:
+        """Queue a forecast request and wait for its batched result"""
+        key = (product_id, forecast_days)
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[key] = future
+            self._queue.append(key)
+            if len(self._queue) >= self.max_batch_size:
+                self._schedule_flush(loop, now=True)
+            elif self._timer is None:
+                self._schedule_flush(loop)
+        # Shield so one caller being cancelled does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, now: bool = False) -> None:
+        """Arm the flush timer, or flush immediately when the batch is full"""
+        if now:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._start_flush(loop)
+        else:
+            self._timer = loop.call_later(self.max_wait, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self) -> None:
+        """Run one vectorized model call for everything queued and fan out results"""
+        self._timer = None
+        keys, self._queue = self._queue, []
+        if not keys:
+            return
+        try:
+            results = await self.predictor.predict_sales_batch(keys)
+        except Exception as e:
+            for key in keys:
+                future = self._in_flight.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, result in zip(keys, results):
+            future = self._in_flight.pop(key)
+            if not future.done():
+                future.set_result(result)
+        if len(results) < len(keys):
+            # Never leave callers waiting on keys the predictor did not answer
+            error = RuntimeError(f"Predictor returned {len(results)} results for {len(keys)} requests")
+            for key in keys[len(results):]:
+                future = self._in_flight.pop(key)
+                if not future.done():
+                    future.set_exception(error)
@@ -1,30 +1,230 @@
 from app.models.base_model import BaseModel
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from app.preprocessing.scaler import ScalerBank
+
+class WindowedDataset:
+    """Sliding windows over a (products x time) matrix without copying"""
+
+    def __init__(self, series: np.ndarray, window: int):
+        if series.shape[1] <= window:
+            raise ValueError(f"Series of length {series.shape[1]} too short for window {window}")
+        self.window = window
+        self.windows = sliding_window_view(series, window + 1, axis=1)
+        n_products, n_windows = self.windows.shape[:2]
+        # (product, window) index pairs; windows containing gaps (NaN) are skipped.
+        # NaNs per window come from a running count, so no (windows x length) mask is built.
+        nan_count = np.concatenate([
+            np.zeros((n_products, 1), dtype=np.int32),
+            np.cumsum(np.isnan(series), axis=1, dtype=np.int32)
+        ], axis=1)
+        valid = (nan_count[:, window + 1:] - nan_count[:, :n_windows]) == 0
+        self.index = np.argwhere(valid).astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def split(self, validation_fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Split index pairs chronologically into train and validation sets"""
+        cutoff = np.quantile(self.index[:, 1], 1 - validation_fraction) if len(self.index) else 0
+        is_validation = self.index[:, 1] > cutoff
+        return self.index[~is_validation], self.index[is_validation]
+
+    def batch(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gather (inputs, targets) for index pairs; inputs are (batch, window, 1)"""
+        rows = self.windows[index[:, 0], index[:, 1]]
+        return rows[:, :-1, None].astype(np.float32), rows[:, -1:].astype(np.float32)
+
+    def batches(self, index: np.ndarray, batch_size: int,
+                rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Iterate over mini-batches, shuffled when an rng is given"""
+        order = rng.permutation(len(index)) if rng is not None else np.arange(len(index))
+        for start in range(0, len(order), batch_size):
+            yield self.batch(index[order[start:start + batch_size]])
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+class NumpyLSTMRuntime:
+    """Inference-only LSTM forward pass over exported weights (PyTorch gate layout)"""
+
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        self.num_layers = int(weights["num_layers"])
+        self.layers = [
+            (weights[f"w_ih_{k}"].T.copy(), weights[f"w_hh_{k}"].T.copy(), weights[f"b_{k}"])
+            for k in range(self.num_layers)
+        ]
+        self.w_out = weights["w_out"].T.copy()
+        self.b_out = weights["b_out"]
+        self.hidden_size = self.layers[0][1].shape[0]
+
+    def forward(self, inputs: np.ndarray) -> np.ndarray:
+        """Map (batch, time, features) inputs to (batch, 1) next-step outputs"""
+        sequence = inputs.astype(np.float32)
+        batch = sequence.shape[0]
+        for w_ih, w_hh, b in self.layers:
+            h = np.zeros((batch, self.hidden_size), dtype=np.float32)
+            c = np.zeros_like(h)
+            # Input projection for every time step in one matmul
+            projected = sequence @ w_ih + b
+            outputs = np.empty((batch, sequence.shape[1], self.hidden_size), dtype=np.float32)
+            for t in range(sequence.shape[1]):
+                gates = projected[:, t] + h @ w_hh
+                i, f, g, o = np.split(gates, 4, axis=1)
+                c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+                h = _sigmoid(o) * np.tanh(c)
+                outputs[:, t] = h
+            sequence = outputs
+        return sequence[:, -1] @ self.w_out + self.b_out
 
 class LSTMModel(BaseModel):
     """LSTM model for deep learning predictions"""
-    
-    def __init__(self):
+
+    def __init__(self, window: int = 28, hidden_size: int = 32, num_layers: int = 1,
+                 epochs: int = 10, batch_size: int = 512, learning_rate: float = 1e-2,
+                 validation_fraction: float = 0.1, seed: int = 42):
+        self.window = window
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.validation_fraction = validation_fraction
+        self.seed = seed
         self.model = None
-    
+        self.runtime: Optional[NumpyLSTMRuntime] = None
+        self.product_ids: List[str] = []
+        self.product_index: Dict[str, int] = {}
+        self.scalers = ScalerBank()
+        self.last_windows = np.empty((0, window), dtype=np.float32)
+
+    @staticmethod
+    def _series_matrix(data: Dict) -> Tuple[List[str], np.ndarray]:
+        """Build a NaN-padded (products x time) matrix from training data"""
+        if "series" in data:
+            series = data["series"]
+        elif data.get("data_path"):
+            from app.training.data_loader import DataLoader
+            date_column = data.get("date_column", "date")
+            value_column = data.get("value_column", "quantity")
+            df = DataLoader.load_columnar(data["data_path"], columns=["productId", date_column, value_column])
+            df[date_column] = pd.to_datetime(df[date_column]).dt.normalize()
+            wide = df.pivot_table(index="productId", columns=date_column, values=value_column,
+                                  aggfunc="sum", observed=True)
+            wide = wide.reindex(columns=pd.date_range(wide.columns.min(), wide.columns.max(), freq="D"))
+            matrix = wide.to_numpy(dtype=np.float32)
+            # Days without sales rows are zero sales once a product has started selling
+            started = np.logical_or.accumulate(~np.isnan(matrix), axis=1)
+            matrix[started & np.isnan(matrix)] = 0.0
+            return [str(p) for p in wide.index], matrix
+        else:
+            raise ValueError("LSTM training needs 'series' or 'data_path'")
+        product_ids = [str(p) for p in series]
+        length = max(len(v) for v in series.values())
+        matrix = np.full((len(series), length), np.nan, dtype=np.float32)
+        for row, values in enumerate(series.values()):
+            # Right-align so every product ends on the latest date
+            matrix[row, length - len(values):] = values
+        return product_ids, matrix
+
     def train(self, data: Dict) -> Dict:
         """Train LSTM model"""
-        # Placeholder - implement actual LSTM training
-        return {"status": "trained", "accuracy": 0.88}
-    
+        import torch
+        from torch import nn
+
+        product_ids, matrix = self._series_matrix(data)
+        self.scalers = ScalerBank().fit_matrix(product_ids, matrix)
+        scaled = self.scalers.transform_matrix(product_ids, matrix).astype(np.float32)
+
+        dataset = WindowedDataset(scaled, self.window)
+        train_index, validation_index = dataset.split(self.validation_fraction)
+        if not len(train_index):
+            raise ValueError("Not enough history to build training windows")
+
+        torch.manual_seed(self.seed)
+        rng = np.random.default_rng(self.seed)
+        lstm = nn.LSTM(1, self.hidden_size, num_layers=self.num_layers, batch_first=True)
+        head = nn.Linear(self.hidden_size, 1)
+        parameters = list(lstm.parameters()) + list(head.parameters())
+        optimizer = torch.optim.Adam(parameters, lr=self.learning_rate)
+        loss_fn = nn.MSELoss()
+
+        for _ in range(self.epochs):
+            for inputs, targets in dataset.batches(train_index, self.batch_size, rng):
+                optimizer.zero_grad()
+                output, _ = lstm(torch.from_numpy(inputs))
+                loss = loss_fn(head(output[:, -1]), torch.from_numpy(targets))
+                loss.backward()
+                optimizer.step()
+
+        weights = {"num_layers": np.array(self.num_layers)}
+        for k in range(self.num_layers):
+            weights[f"w_ih_{k}"] = getattr(lstm, f"weight_ih_l{k}").detach().numpy().copy()
+            weights[f"w_hh_{k}"] = getattr(lstm, f"weight_hh_l{k}").detach().numpy().copy()
+            weights[f"b_{k}"] = (getattr(lstm, f"bias_ih_l{k}") + getattr(lstm, f"bias_hh_l{k}")).detach().numpy().copy()
+        weights["w_out"] = head.weight.detach().numpy().copy()
+        weights["b_out"] = head.bias.detach().numpy().copy()
+        self.model = weights
+        self.runtime = NumpyLSTMRuntime(weights)
+
+        self.product_ids = product_ids
+        self.product_index = {p: i for i, p in enumerate(product_ids)}
+        last = scaled[:, -self.window:]
+        self.last_windows = np.where(np.isnan(last), 0.0, last).astype(np.float32)
+
+        accuracy = 0.0
+        if len(validation_index):
+            from app.training.evaluator import Evaluator
+            y_true, y_pred = [], []
+            for inputs, targets in dataset.batches(validation_index, self.batch_size):
+                y_true.append(targets[:, 0])
+                y_pred.append(self.runtime.forward(inputs)[:, 0])
+            accuracy = max(0.0, float(Evaluator.calculate_r2(np.concatenate(y_true), np.concatenate(y_pred))))
+        return {"status": "trained", "accuracy": accuracy, "windows": len(dataset)}
+
+    def predict_batch(self, product_ids: List[str], forecast_days: int = 30) -> np.ndarray:
+        """Recursive multi-step forecast for many products in one batched pass"""
+        if self.runtime is None:
+            raise ValueError("LSTM model is not trained or loaded")
+        rows = np.array([self.product_index[p] for p in product_ids], dtype=np.int64)
+        history = self.last_windows[rows]
+        forecasts = np.empty((len(rows), forecast_days), dtype=np.float32)
+        for step in range(forecast_days):
+            next_value = self.runtime.forward(history[:, :, None])[:, 0]
+            forecasts[:, step] = next_value
+            history = np.concatenate([history[:, 1:], next_value[:, None]], axis=1)
+        return self.scalers.inverse_transform_matrix(product_ids, forecasts)
+
     def predict(self, data: Dict) -> List[float]:
         """Make predictions using LSTM"""
-        # Placeholder - implement actual prediction
         forecast_days = data.get("forecast_days", 30)
-        return [100.0 + i * 1.8 for i in range(forecast_days)]
-    
+        return self.predict_batch([str(data["product_id"])], forecast_days)[0].tolist()
+
     def save(self, path: str) -> None:
         """Save LSTM model"""
-        # Placeholder - implement actual save
-        pass
-    
+        if self.model is None:
+            raise ValueError("LSTM model is not trained")
+        np.savez_compressed(
+            path,
+            window=np.array(self.window),
+            product_ids=np.array(self.product_ids),
+            **{f"scaler_{name}": value for name, value in self.scalers.state_dict().items()},
+            last_windows=self.last_windows,
+            **self.model
+        )
+
     def load(self, path: str) -> None:
         """Load LSTM model"""
-        # Placeholder - implement actual load
-        pass
-
+        with np.load(path, allow_pickle=False) as artifact:
+            arrays = {name: artifact[name] for name in artifact.files}
+        self.window = int(arrays.pop("window"))
+        self.product_ids = [str(p) for p in arrays.pop("product_ids")]
+        self.product_index = {p: i for i, p in enumerate(self.product_ids)}
+        scaler_state = {name[len("scaler_"):]: arrays.pop(name) for name in list(arrays) if name.startswith("scaler_")}
+        self.scalers = ScalerBank.from_state_dict(scaler_state)
+        self.last_windows = arrays.pop("last_windows")
+        self.num_layers = int(arrays["num_layers"])
+        self.model = arrays
+        self.runtime = NumpyLSTMRuntime(arrays)
@@ -1,31 +1,254 @@
 from app.models.base_model import BaseModel
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import datetime
+import json
+import logging
+import multiprocessing
 import os
+import numpy as np
+import pandas as pd
+
+def _quiet_stan() -> None:
+    from cmdstanpy.utils import get_logger
+    # cmdstanpy logs two INFO lines per fit
+    get_logger().setLevel(logging.WARNING)
+
+def warm_start_params(model) -> Dict:
+    """Fitted parameters of a Prophet model, usable as ``init`` for the next fit"""
+    return {
+        "k": float(model.params["k"][0][0]),
+        "m": float(model.params["m"][0][0]),
+        "sigma_obs": float(model.params["sigma_obs"][0][0]),
+        "delta": model.params["delta"][0].tolist(),
+        "beta": model.params["beta"][0].tolist(),
+    }
+
+def _fit_products(items: List[Tuple[str, pd.DataFrame, Optional[Dict]]],
+                  config: Dict) -> List[Tuple[str, str, Dict, float]]:
+    """Fit one Prophet model per product; returns (product_id, model JSON, parameters, in-sample R2)"""
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+    _quiet_stan()
+
+    results = []
+    for product_id, frame, init in items:
+        model = Prophet(uncertainty_samples=0, **config)
+        if init:
+            # Prophet falls back to default inits for arrays whose shape changed
+            init = {**init, "delta": np.asarray(init["delta"]), "beta": np.asarray(init["beta"])}
+            model.fit(frame, init=init)
+        else:
+            model.fit(frame)
+        fitted = model.predict(frame[["ds"]])["yhat"].to_numpy()
+        y = frame["y"].to_numpy(dtype=np.float64)
+        total = float(((y - y.mean()) ** 2).sum())
+        r2 = 1.0 - float(((y - fitted) ** 2).sum()) / total if total > 0 else 0.0
+        results.append((product_id, model_to_json(model), warm_start_params(model), r2))
+    return results
+
+# Serialized models and their deserialized cache inside a pool worker, set by _init_worker
+_worker_models: Dict[str, str] = {}
+_worker_cache: Dict[str, object] = {}
+
+def _init_worker(models: Dict[str, str]) -> None:
+    global _worker_models
+    _worker_models = models
+    _worker_cache.clear()
+    _quiet_stan()
+
+def _predict_products(product_ids: List[str], start: datetime.date, forecast_days: int, uncertainty_samples: int,
+                      models: Optional[Dict[str, str]] = None,
+                      cache: Optional[Dict[str, object]] = None) -> List[Tuple[str, np.ndarray, np.ndarray, np.ndarray]]:
+    """Forecast products; returns (product_id, yhat, lower, upper)"""
+    from prophet.serialize import model_from_json
+    from scipy.special import ndtri
+    _quiet_stan()
+    if models is None:
+        models, cache = _worker_models, _worker_cache
+
+    results = []
+    for product_id in product_ids:
+        model = cache.get(product_id)
+        if model is None:
+            model = cache[product_id] = model_from_json(models[product_id])
+        model.uncertainty_samples = uncertainty_samples
+        # Explicit dates: a model fitted on older history must not start its forecast at its own last day
+        future = pd.DataFrame({"ds": pd.date_range(start, periods=forecast_days, freq="D")})
+        forecast = model.predict(future, vectorized=True)
+        yhat = forecast["yhat"].to_numpy()
+        if uncertainty_samples:
+            lower, upper = forecast["yhat_lower"].to_numpy(), forecast["yhat_upper"].to_numpy()
+        else:
+            # Observation-noise band from the fitted sigma; skips trend simulation
+            half_width = ndtri(0.5 + model.interval_width / 2) * model.params["sigma_obs"][0][0] * model.y_scale
+            lower, upper = yhat - half_width, yhat + half_width
+        results.append((product_id, yhat, lower, upper))
+    return results
 
 class ProphetModel(BaseModel):
     """Prophet model for time series forecasting"""
-    
-    def __init__(self):
-        self.model = None
-    
+
+    def __init__(self, uncertainty_samples: Optional[int] = None, interval_width: float = 0.8,
+                 workers: Optional[int] = None, chunk_size: int = 8, **prophet_kwargs):
+        self.uncertainty_samples = (uncertainty_samples if uncertainty_samples is not None
+                                    else int(os.getenv("PROPHET_UNCERTAINTY_SAMPLES", 0)))
+        self.workers = workers or int(os.getenv("PROPHET_WORKERS", os.cpu_count() or 1))
+        self.chunk_size = chunk_size
+        self.config = {"interval_width": interval_width, **prophet_kwargs}
+        # Serialized model per product
+        self.model: Dict[str, str] = {}
+        # Fitted parameters per product, used to warm-start the next fit
+        self.params: Dict[str, Dict] = {}
+        # Deserialized models for in-process prediction
+        self._cache: Dict[str, object] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def _training_frame(data: Dict) -> pd.DataFrame:
+        """Long (productId, ds, y) frame of daily sales from training data"""
+        date_column = data.get("date_column", "date")
+        value_column = data.get("value_column", "quantity")
+        if "sales" in data:
+            df = data["sales"]
+        elif data.get("data_path"):
+            from app.training.data_loader import DataLoader
+            df = DataLoader.load_columnar(data["data_path"], columns=["productId", date_column, value_column])
+        else:
+            raise ValueError("Prophet training needs sales data ('sales' or 'data_path')")
+        if data.get("product_ids"):
+            # Targeted refit (e.g. drifted products); other products keep their models
+            df = df[df["productId"].astype(str).isin([str(p) for p in data["product_ids"]])]
+        daily = (df.assign(productId=df["productId"].astype(str), ds=pd.to_datetime(df[date_column]).dt.normalize())
+                 .groupby(["productId", "ds"], observed=True)[value_column].sum())
+        if daily.empty:
+            return daily.rename("y").reset_index()
+        # Sales exports have no rows for days without sales: those are zeros, from a product's first sale on
+        last = daily.index.get_level_values("ds").max()
+        first = daily.index.to_frame(index=False).groupby("productId")["ds"].min()
+        full = pd.MultiIndex.from_frame(pd.concat(
+            pd.DataFrame({"productId": product_id, "ds": pd.date_range(start, last, freq="D")})
+            for product_id, start in first.items()
+        ))
+        return daily.reindex(full, fill_value=0).rename("y").reset_index()
+
+    def _start_pool(self, models: Optional[Dict[str, str]] = None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(models or {},)
+        )
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """The prediction pool, started on first use with the current models"""
+        if self._pool is None:
+            self._pool = self._start_pool(self.model)
+        return self._pool
+
+    def start_workers(self) -> None:
+        """Start the prediction pool now rather than on the first forecast request"""
+        if self.workers > 1 and self.model:
+            self._executor()
+
+    def _models_changed(self) -> None:
+        """Drop deserialized models; workers restart with the new ones"""
+        self._cache = {}
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @staticmethod
+    def _gather(pool: ProcessPoolExecutor, function, chunks: List[List], *args) -> List:
+        futures = [pool.submit(function, chunk, *args) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def _chunks(self, items: List) -> List[List]:
+        return [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
     def train(self, data: Dict) -> Dict:
         """Train Prophet model"""
-        # Placeholder - implement actual Prophet training
-        return {"status": "trained", "accuracy": 0.85}
-    
+        frame = self._training_frame(data)
+        items = [
+            (product_id, group[["ds", "y"]].reset_index(drop=True), self.params.get(product_id))
+            for product_id, group in frame.groupby("productId", sort=True)
+            if group["y"].notna().sum() >= 2
+        ]
+        if not items:
+            raise ValueError("No product has enough history to fit Prophet")
+        warm_started = sum(1 for _, _, init in items if init)
+
+        chunks = self._chunks(items)
+        if self.workers <= 1 or len(chunks) <= 1:
+            results = _fit_products(items, self.config)
+        else:
+            # Fits only need their training data: a pool of its own, without the serialized models
+            with self._start_pool() as pool:
+                results = self._gather(pool, _fit_products, chunks, self.config)
+        scores = []
+        for product_id, model_json, params, r2 in results:
+            self.model[product_id] = model_json
+            self.params[product_id] = params
+            scores.append(r2)
+        self._models_changed()
+        return {
+            "status": "trained",
+            "accuracy": max(0.0, float(np.mean(scores))),
+            "products": len(results),
+            "warm_started": warm_started,
+        }
+
+    def predict_batch(self, product_ids: List[str], forecast_days: int = 30,
+                      start_date: Optional[datetime.date] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Predictions and interval bounds as (products x days) arrays, from ``start_date`` (default tomorrow, UTC)"""
+        start = start_date or datetime.datetime.now(datetime.timezone.utc).date() + datetime.timedelta(days=1)
+        missing = [p for p in product_ids if p not in self.model]
+        if missing:
+            raise ValueError(f"No Prophet model for products: {', '.join(missing[:5])}")
+        chunks = self._chunks(list(dict.fromkeys(product_ids)))
+        if self.workers <= 1 or len(chunks) <= 1:
+            results = _predict_products([p for chunk in chunks for p in chunk], start, forecast_days,
+                                        self.uncertainty_samples, self.model, self._cache)
+        else:
+            results = self._gather(self._executor(), _predict_products, chunks, start, forecast_days,
+                                   self.uncertainty_samples)
+        rows = {product_id: (yhat, lower, upper) for product_id, yhat, lower, upper in results}
+        predictions, lower, upper = (np.maximum(np.stack([rows[p][i] for p in product_ids]), 0.0) for i in range(3))
+        return predictions, lower, upper
+
     def predict(self, data: Dict) -> List[float]:
         """Make predictions using Prophet"""
-        # Placeholder - implement actual prediction
         forecast_days = data.get("forecast_days", 30)
-        return [100.0 + i * 2 for i in range(forecast_days)]
-    
+        predictions, _, _ = self.predict_batch([str(data["product_id"])], forecast_days)
+        return predictions[0].tolist()
+
+    @property
+    def interval_width(self) -> float:
+        """Coverage of the prediction intervals"""
+        return self.config["interval_width"]
+
     def save(self, path: str) -> None:
         """Save Prophet model"""
-        # Placeholder - implement actual save
-        pass
-    
+        if not self.model:
+            raise ValueError("Prophet model is not trained")
+        with open(path, "w") as f:
+            json.dump({"format": "prophet-json", "models": self.model, "params": self.params,
+                       "interval_width": self.interval_width}, f)
+
     def load(self, path: str) -> None:
         """Load Prophet model"""
-        # Placeholder - implement actual load
-        pass
+        with open(path) as f:
+            artifact = json.load(f)
+        self.model = artifact["models"]
+        # Loaded parameters seed the next training run
+        self.params = artifact.get("params", {})
+        # The serialized models carry the width they were fitted with
+        self.config["interval_width"] = artifact.get("interval_width", self.interval_width)
+        self._models_changed()
 
+    def unload(self) -> None:
+        """Drop the models and parameters, e.g. once saved for the model store to serve"""
+        self.model, self.params = {}, {}
+        self._models_changed()
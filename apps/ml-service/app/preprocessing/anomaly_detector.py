@@ -0,0 +1,113 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+class StreamingAnomalyDetector:
+    """Online per-product anomaly detection with constant memory per product"""
+
+    def __init__(self, alpha: float = 0.1, threshold: float = 3.5, warmup: int = 7,
+                 noise_floor: float = 0.5, min_std: float = 0.5):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.noise_floor = noise_floor
+        self.min_std = min_std
+        self.products: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.count = np.zeros(0, dtype=np.int32)
+        self.mean = np.zeros(0, dtype=np.float64)
+        self.var = np.zeros(0, dtype=np.float64)
+        self.last_score = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def _rows(self, product_ids) -> np.ndarray:
+        """Row index per product id, registering unseen products"""
+        labels = [str(p) for p in product_ids]
+        missing = list(dict.fromkeys(p for p in labels if p not in self.index))
+        if missing:
+            start = len(self.products)
+            self.products.extend(missing)
+            self.index.update({p: start + i for i, p in enumerate(missing)})
+            grow = len(missing)
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int32)])
+            self.mean = np.concatenate([self.mean, np.zeros(grow)])
+            self.var = np.concatenate([self.var, np.zeros(grow)])
+            self.last_score = np.concatenate([self.last_score, np.zeros(grow, dtype=np.float32)])
+        return np.fromiter((self.index[p] for p in labels), dtype=np.int64, count=len(labels))
+
+    def update(self, product_ids, values, expected=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a batch of observations and fold them into the state; returns (scores, is_anomaly)"""
+        rows = self._rows(product_ids)
+        values = np.asarray(values, dtype=np.float64)
+        if expected is None:
+            expected = np.full(len(rows), np.nan)
+        expected = np.asarray(expected, dtype=np.float64)
+        scores = np.zeros(len(rows), dtype=np.float64)
+        anomalies = np.zeros(len(rows), dtype=bool)
+
+        # Split repeated products into rounds so each round has unique rows
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_rows)) + 1]
+        occurrence = np.empty(len(rows), dtype=np.int64)
+        occurrence[order] = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+        for round_number in range(int(occurrence.max()) + 1 if len(rows) else 0):
+            batch = np.flatnonzero(occurrence == round_number)
+            r = rows[batch]
+            x = values[batch]
+            forecast = expected[batch]
+            baseline = np.where(np.isnan(forecast), self.mean[r], forecast)
+            residual = x - baseline
+            # Correct the start-up bias of an EW variance initialised at zero
+            weight = 1.0 - (1.0 - self.alpha) ** np.maximum(self.count[r] - 1, 0)
+            std = np.sqrt(self.var[r] / np.where(weight > 0, weight, 1.0))
+            # Roughly Poisson count noise, so a jump from a constant history (e.g. all zeros) is still flagged
+            std = np.maximum(std, np.maximum(self.noise_floor * np.sqrt(np.abs(baseline)), self.min_std))
+            warm = self.count[r] >= self.warmup
+            z = np.where(warm, residual / std, 0.0)
+            scores[batch] = z
+            anomalies[batch] = warm & (np.abs(z) > self.threshold)
+
+            # Winsorize the update so anomalies do not shift the baseline
+            limit = np.where(warm, self.threshold * std, np.inf)
+            clipped = np.clip(residual, -limit, limit)
+            first = self.count[r] == 0
+            delta = np.where(first, 0.0, clipped)
+            # The level follows the (winsorized) observation; the variance follows the residual
+            level_delta = np.where(first, 0.0, np.clip(x - self.mean[r], -limit, limit))
+            self.mean[r] = np.where(first, x, self.mean[r] + self.alpha * level_delta)
+            self.var[r] = (1 - self.alpha) * (self.var[r] + self.alpha * delta ** 2)
+            self.count[r] += 1
+            self.last_score[r] = z
+        return scores, anomalies
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """State as plain arrays, for saving next to model artifacts"""
+        return {
+            "params": np.array([self.alpha, self.threshold, self.warmup, self.noise_floor, self.min_std],
+                               dtype=np.float64),
+            "products": np.array(self.products, dtype=str),
+            "count": self.count, "mean": self.mean, "var": self.var, "last_score": self.last_score,
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, np.ndarray]) -> "StreamingAnomalyDetector":
+        """Rebuild a detector from ``state_dict`` arrays"""
+        params = [float(p) for p in state["params"]]
+        detector = cls(params[0], params[1], int(params[2]), *params[3:])
+        detector.products = [str(p) for p in state["products"]]
+        detector.index = {p: i for i, p in enumerate(detector.products)}
+        for name in ("count", "mean", "var", "last_score"):
+            setattr(detector, name, np.asarray(state[name]))
+        return detector
+
+    def save(self, path: str) -> None:
+        """Save state as a compressed NumPy archive"""
+        np.savez_compressed(path, **self.state_dict())
+
+    @classmethod
+    def load(cls, path: str) -> "StreamingAnomalyDetector":
+        """Load state saved with ``save``"""
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls.from_state_dict({name: artifact[name] for name in artifact.files})
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Optional
+from app.preprocessing.anomaly_detector import StreamingAnomalyDetector
 
 class FeatureEngineer:
     """Feature engineering for ML models"""
@@ -16,17 +18,47 @@ class FeatureEngineer:
         return df
     
     @staticmethod
-    def create_lag_features(df: pd.DataFrame, column: str, lags: List[int]) -> pd.DataFrame:
-        """Create lag features"""
+    def create_lag_features(df: pd.DataFrame, column: str, lags: List[int],
+                            group_column: Optional[str] = None) -> pd.DataFrame:
+        """Create lag features, within each group when ``group_column`` is given"""
+        series = df.groupby(group_column, observed=True, sort=False)[column] if group_column else df[column]
         for lag in lags:
-            df[f'{column}_lag_{lag}'] = df[column].shift(lag)
+            df[f'{column}_lag_{lag}'] = series.shift(lag)
         return df
     
     @staticmethod
-    def create_rolling_features(df: pd.DataFrame, column: str, windows: List[int]) -> pd.DataFrame:
-        """Create rolling window features"""
+    def create_rolling_features(df: pd.DataFrame, column: str, windows: List[int],
+                                group_column: Optional[str] = None) -> pd.DataFrame:
+        """Create rolling window features, within each group when ``group_column`` is given"""
         for window in windows:
-            df[f'{column}_rolling_mean_{window}'] = df[column].rolling(window=window).mean()
-            df[f'{column}_rolling_std_{window}'] = df[column].rolling(window=window).std()
+            if group_column:
+                rolling = df.groupby(group_column, observed=True, sort=False)[column].rolling(window=window)
+                # Drop the group level so values align back to the original rows
+                df[f'{column}_rolling_mean_{window}'] = rolling.mean().reset_index(level=0, drop=True)
+                df[f'{column}_rolling_std_{window}'] = rolling.std().reset_index(level=0, drop=True)
+            else:
+                df[f'{column}_rolling_mean_{window}'] = df[column].rolling(window=window).mean()
+                df[f'{column}_rolling_std_{window}'] = df[column].rolling(window=window).std()
+        return df
+    
+    @staticmethod
+    def create_anomaly_features(df: pd.DataFrame, product_column: str, date_column: str, value_column: str,
+                                detector: Optional[StreamingAnomalyDetector] = None) -> pd.DataFrame:
+        """Create online anomaly score features, replaying rows in date order"""
+        # An empty detector is falsy (len 0), so test for None
+        detector = detector if detector is not None else StreamingAnomalyDetector()
+        scores = np.zeros(len(df))
+        flags = np.zeros(len(df), dtype=bool)
+        dates = pd.to_datetime(df[date_column]).to_numpy()
+        order = np.argsort(dates, kind="stable")
+        boundaries = np.flatnonzero(np.diff(dates[order])) + 1
+        products = df[product_column].astype(str).to_numpy()
+        values = df[value_column].to_numpy(dtype=np.float64)
+        # One vectorized update per date across all products
+        for positions in np.split(order, boundaries):
+            batch_scores, batch_flags = detector.update(products[positions], values[positions])
+            scores[positions] = batch_scores
+            flags[positions] = batch_flags
+        df[f'{value_column}_anomaly_score'] = scores
+        df[f'{value_column}_is_anomaly'] = flags.astype(int)
         return df
-
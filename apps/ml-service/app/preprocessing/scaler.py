@@ -1,6 +1,7 @@
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from typing import Dict
+from typing import Dict, List
 import numpy as np
+import pandas as pd
 
 class Scaler:
     """Scale features for ML models"""
@@ -25,3 +26,168 @@ class Scaler:
         """Inverse transform data"""
         return self.scaler.inverse_transform(data)
 
+class ScalerBank:
+    """Per-group scaling statistics stored in contiguous arrays"""
+
+    def __init__(self, method: str = "standard"):
+        if method not in ("standard", "minmax"):
+            raise ValueError(f"Unknown scaling method: {method}")
+        self.method = method
+        self.groups: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0, dtype=np.float64)
+        self.m2 = np.zeros(0, dtype=np.float64)
+        self.min = np.zeros(0, dtype=np.float64)
+        self.max = np.zeros(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def _codes(self, groups: np.ndarray, add: bool = False) -> np.ndarray:
+        """Map group labels to row indices, optionally registering new groups"""
+        # Hash factorization; only the distinct labels are converted to str
+        inverse, uniques = pd.factorize(np.asarray(groups).ravel())
+        labels = [str(label) for label in uniques]
+        missing = list(dict.fromkeys(label for label in labels if label not in self.index))
+        if missing:
+            if not add:
+                raise KeyError(f"Unknown groups: {missing[:5]}")
+            start = len(self.groups)
+            self.groups.extend(missing)
+            self.index.update({label: start + i for i, label in enumerate(missing)})
+            grow = len(missing)
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.mean = np.concatenate([self.mean, np.zeros(grow)])
+            self.m2 = np.concatenate([self.m2, np.zeros(grow)])
+            self.min = np.concatenate([self.min, np.full(grow, np.inf)])
+            self.max = np.concatenate([self.max, np.full(grow, -np.inf)])
+        rows = np.fromiter((self.index[label] for label in labels), dtype=np.int64, count=len(labels))
+        return rows[inverse]
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation per group"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > 0, self.m2 / np.maximum(self.count, 1), 0.0))
+
+    def _offset_scale(self, rows: np.ndarray):
+        if self.method == "standard":
+            offset, scale = self.mean[rows], self.std[rows]
+        else:
+            offset, scale = self.min[rows], self.max[rows] - self.min[rows]
+        # Constant groups pass through centred, as sklearn does
+        return offset, np.where(scale > 0, scale, 1.0)
+
+    def fit(self, groups: np.ndarray, values: np.ndarray) -> "ScalerBank":
+        """Fit statistics for every group in one grouped reduction"""
+        self.__init__(self.method)
+        return self.partial_fit(groups, values)
+
+    def partial_fit(self, groups: np.ndarray, values: np.ndarray) -> "ScalerBank":
+        """Merge a batch of observations into the per-group statistics"""
+        values = np.asarray(values, dtype=np.float64)
+        rows = self._codes(groups, add=True)
+        size = len(self.groups)
+        batch_count = np.bincount(rows, minlength=size)
+        batch_sum = np.bincount(rows, weights=values, minlength=size)
+        batch_mean = np.divide(batch_sum, batch_count, out=np.zeros(size), where=batch_count > 0)
+        deviation = values - batch_mean[rows]
+        batch_m2 = np.bincount(rows, weights=deviation * deviation, minlength=size)
+        batch_min, batch_max = np.full(size, np.inf), np.full(size, -np.inf)
+        np.minimum.at(batch_min, rows, values)
+        np.maximum.at(batch_max, rows, values)
+        self._merge(batch_count, batch_mean, batch_m2, batch_min, batch_max)
+        return self
+
+    def partial_fit_matrix(self, groups: np.ndarray, matrix: np.ndarray) -> "ScalerBank":
+        """Merge a (groups x observations) matrix, NaN marking missing values"""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        rows = self._codes(groups, add=True)
+        if len(np.unique(rows)) != len(rows):
+            raise ValueError("Matrix rows must belong to distinct groups")
+        observed = ~np.isnan(matrix)
+        count = observed.sum(axis=1)
+        mean = np.divide(np.where(observed, matrix, 0.0).sum(axis=1), count,
+                         out=np.zeros(len(rows)), where=count > 0)
+        m2 = np.where(observed, (matrix - mean[:, None]) ** 2, 0.0).sum(axis=1)
+
+        size = len(self.groups)
+        batch = {"count": np.zeros(size, dtype=np.int64), "mean": np.zeros(size), "m2": np.zeros(size),
+                 "min": np.full(size, np.inf), "max": np.full(size, -np.inf)}
+        batch["count"][rows] = count
+        batch["mean"][rows] = mean
+        batch["m2"][rows] = m2
+        batch["min"][rows] = np.where(observed, matrix, np.inf).min(axis=1)
+        batch["max"][rows] = np.where(observed, matrix, -np.inf).max(axis=1)
+        self._merge(batch["count"], batch["mean"], batch["m2"], batch["min"], batch["max"])
+        return self
+
+    def _merge(self, batch_count: np.ndarray, batch_mean: np.ndarray, batch_m2: np.ndarray,
+               batch_min: np.ndarray, batch_max: np.ndarray) -> None:
+        """Chan et al. parallel merge of per-group batch (count, mean, M2, min, max)"""
+        seen = batch_count > 0
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        safe_total = np.maximum(total, 1)
+        self.mean = np.where(seen, self.mean + delta * batch_count / safe_total, self.mean)
+        self.m2 = np.where(seen, self.m2 + batch_m2 + delta ** 2 * self.count * batch_count / safe_total, self.m2)
+        self.count = total
+        self.min = np.minimum(self.min, batch_min)
+        self.max = np.maximum(self.max, batch_max)
+
+    def transform(self, groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Scale a batch of values by their group's statistics"""
+        offset, scale = self._offset_scale(self._codes(groups))
+        return (np.asarray(values, dtype=np.float64) - offset) / scale
+
+    def fit_matrix(self, groups: np.ndarray, matrix: np.ndarray) -> "ScalerBank":
+        """Fit statistics from a (groups x observations) matrix"""
+        self.__init__(self.method)
+        return self.partial_fit_matrix(groups, matrix)
+
+    def transform_matrix(self, groups: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Scale each matrix row by its group's statistics"""
+        offset, scale = self._offset_scale(self._codes(groups))
+        return (np.asarray(matrix, dtype=np.float64) - offset[:, None]) / scale[:, None]
+
+    def inverse_transform_matrix(self, groups: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Undo scaling for each matrix row"""
+        offset, scale = self._offset_scale(self._codes(groups))
+        return np.asarray(matrix, dtype=np.float64) * scale[:, None] + offset[:, None]
+
+    def fit_transform(self, groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Fit and transform data"""
+        return self.fit(groups, values).transform(groups, values)
+
+    def inverse_transform(self, groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Undo scaling for a batch of values"""
+        offset, scale = self._offset_scale(self._codes(groups))
+        return np.asarray(values, dtype=np.float64) * scale + offset
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """Statistics as plain arrays, for embedding in model artifacts"""
+        return {
+            "method": np.array(self.method), "groups": np.array(self.groups, dtype=str),
+            "count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max,
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, np.ndarray]) -> "ScalerBank":
+        """Rebuild a bank from ``state_dict`` arrays"""
+        bank = cls(str(state["method"]))
+        bank.groups = [str(g) for g in state["groups"]]
+        bank.index = {g: i for i, g in enumerate(bank.groups)}
+        for name in ("count", "mean", "m2", "min", "max"):
+            setattr(bank, name, np.asarray(state[name]))
+        return bank
+
+    def save(self, path: str) -> None:
+        """Save statistics as a compressed NumPy archive"""
+        np.savez_compressed(path, **self.state_dict())
+
+    @classmethod
+    def load(cls, path: str) -> "ScalerBank":
+        """Load statistics saved with ``save``"""
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls.from_state_dict({name: artifact[name] for name in artifact.files})
@@ -0,0 +1,27 @@
+AGENT_PLANNER_PROMPT = """
+You are a sales analytics assistant that can call tools before answering.
+
+Available tools:
+{tools}
+
+User question: {query}
+Known product ids: {product_ids}
+
+Tool results so far:
+{tool_results}
+
+Reply with ONLY a JSON array of tool calls still needed to answer the question,
+for example [{{"tool": "forecast", "args": {{"product_id": "abc", "days": 30}}}}].
+Calls in the same array run in parallel. Reply with [] when no more tools are needed.
+"""
+
+AGENT_ANSWER_PROMPT = """
+Answer the user's question using the tool results below.
+
+User question: {query}
+
+Tool results:
+{tool_results}
+
+Provide a clear, concise answer with concrete numbers and recommendations.
+"""
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class PredictionRequest(BaseModel):
     product_id: str
@@ -11,3 +11,50 @@ class PredictionResponse(BaseModel):
     predictions: List[float]
     confidence_intervals: List[Dict[str, float]] = []
 
+
+class ReplenishmentItem(BaseModel):
+    product_id: str
+    current_stock: float
+    lead_time_days: int = 7
+    unit_cost: float
+    sale_price: float
+    on_order: float = 0
+
+class ReplenishmentRequest(BaseModel):
+    items: List[ReplenishmentItem]
+    review_period_days: int = 7
+    service_level: Optional[float] = None
+
+class ReplenishmentPlan(BaseModel):
+    product_id: str
+    service_level: float
+    safety_stock: float
+    reorder_point: float
+    order_up_to: float
+    order_quantity: float
+    needs_order: bool
+    order_cost: float
+
+class ReplenishmentResponse(BaseModel):
+    plans: List[ReplenishmentPlan]
+    total_order_cost: float
+    # Products without a trained forecast model get no plan
+    untrained_product_ids: List[str] = []
+
+class SalesObservation(BaseModel):
+    product_id: str
+    value: float
+    expected: Optional[float] = None
+
+class AnomalyRequest(BaseModel):
+    observations: List[SalesObservation]
+
+class AnomalyResult(BaseModel):
+    product_id: str
+    value: float
+    score: float
+    is_anomaly: bool
+
+class AnomalyResponse(BaseModel):
+    results: List[AnomalyResult]
+    anomaly_count: int
@@ -1,9 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class TrainingRequest(BaseModel):
     model_type: str  # "prophet", "xgboost", "lstm"
     data_path: Optional[str] = None
+    # Refit only these products (per-product models only), e.g. from the drift monitor
+    product_ids: Optional[List[str]] = None
 
 class TrainingResponse(BaseModel):
     model_type: str
@@ -1,5 +1,9 @@
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CATEGORICAL_COLUMNS = ("productId", "productName", "category", "customerId")
 
 class DataLoader:
     """Load and prepare data for training"""
@@ -10,14 +14,147 @@ class DataLoader:
         return pd.read_csv(file_path)
     
     @staticmethod
-    def load_from_mongodb(connection_string: str, collection: str) -> pd.DataFrame:
+    def optimize_dtypes(df: pd.DataFrame,
+                        categorical_columns: Sequence[str] = CATEGORICAL_COLUMNS) -> pd.DataFrame:
+        """Use categorical ids and downcast numerics to 32-bit"""
+        for column in df.columns:
+            series = df[column]
+            if column in categorical_columns:
+                df[column] = series.astype("category")
+            elif pd.api.types.is_bool_dtype(series):
+                continue
+            elif pd.api.types.is_float_dtype(series):
+                df[column] = series.astype(np.float32)
+            elif pd.api.types.is_integer_dtype(series):
+                low, high = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+                if series.empty or (series.min() >= low and series.max() <= high):
+                    df[column] = series.astype(np.int32)
+        return df
+    
+    @staticmethod
+    def _arrow_dataset(path: str):
+        import pyarrow.dataset as ds
+        if os.path.isdir(path) or path.endswith(".parquet"):
+            return ds.dataset(path, format="parquet",
+                              partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+        return ds.dataset(path, format="csv")
+    
+    @staticmethod
+    def load_columnar(path: str, columns: Optional[List[str]] = None,
+                      filters: Optional[List[Tuple]] = None,
+                      categorical_columns: Sequence[str] = CATEGORICAL_COLUMNS) -> pd.DataFrame:
+        """Load CSV or Parquet through pyarrow with column and predicate pushdown"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        dataset = DataLoader._arrow_dataset(path)
+        expression = None
+        for column, op, value in filters or []:
+            field = ds.field(column)
+            if isinstance(value, str) and column in dataset.schema.names:
+                field_type = dataset.schema.field(column).type
+                if pa.types.is_timestamp(field_type):
+                    value = pd.Timestamp(value)
+                elif pa.types.is_date(field_type):
+                    value = pd.Timestamp(value).date()
+            condition = {
+                "==": lambda: field == value,
+                "!=": lambda: field != value,
+                "<": lambda: field < value,
+                "<=": lambda: field <= value,
+                ">": lambda: field > value,
+                ">=": lambda: field >= value,
+                "in": lambda: field.isin(list(value)),
+            }[op]()
+            expression = condition if expression is None else expression & condition
+        table = dataset.to_table(columns=columns, filter=expression)
+        # Dictionary-encode ids in Arrow so pandas builds categoricals directly
+        for name in categorical_columns:
+            if name in table.column_names:
+                index = table.column_names.index(name)
+                table = table.set_column(index, name, pc.dictionary_encode(table.column(name)))
+        df = table.to_pandas(date_as_object=False)
+        for column in df.select_dtypes("category").columns:
+            df[column] = df[column].cat.remove_unused_categories()
+        return DataLoader.optimize_dtypes(df, categorical_columns)
+    
+    @staticmethod
+    def convert_csv_to_parquet(csv_path: str, output_dir: Optional[str] = None,
+                               date_column: str = "date", block_size: int = 64 << 20) -> str:
+        """Convert a raw CSV once into a Parquet dataset partitioned by month"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pv
+        import pyarrow.dataset as ds
+
+        output_dir = output_dir or os.path.join(
+            os.getenv("ML_TRAINING_DATA_PATH", "./data/processed"),
+            os.path.splitext(os.path.basename(csv_path))[0]
+        )
+        reader = pv.open_csv(csv_path, read_options=pv.ReadOptions(block_size=block_size))
+
+        def downcast(field: pa.Field) -> pa.DataType:
+            if pa.types.is_floating(field.type):
+                return pa.float32()
+            if pa.types.is_integer(field.type):
+                return pa.int32()
+            if field.name in CATEGORICAL_COLUMNS:
+                return pa.dictionary(pa.int32(), pa.string())
+            return field.type
+
+        schema = pa.schema([pa.field(f.name, downcast(f)) for f in reader.schema] + [pa.field("month", pa.string())])
+
+        def batches():
+            for batch in reader:
+                month = pc.strftime(batch.column(date_column), format="%Y-%m")
+                columns = [batch.column(i).cast(schema.field(i).type) for i in range(batch.num_columns)]
+                yield pa.RecordBatch.from_arrays(columns + [month], schema=schema)
+
+        ds.write_dataset(
+            batches(), output_dir, schema=schema, format="parquet",
+            partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+            existing_data_behavior="delete_matching",
+            # Buffer rows per partition so files get few, large row groups
+            min_rows_per_group=1 << 17, max_rows_per_group=1 << 20
+        )
+        return output_dir
+    
+    @staticmethod
+    def flatten_sales(documents: List[Dict]) -> pd.DataFrame:
+        """Flatten sale documents into one row per sold item"""
+        rows = []
+        for doc in documents:
+            for item in doc.get("items", []):
+                rows.append({
+                    "saleId": str(doc.get("_id", "")),
+                    "saleDate": doc.get("saleDate"),
+                    "productId": str(item.get("productId")),
+                    "productName": item.get("productName"),
+                    "quantity": item.get("quantity", 0),
+                    "unitPrice": item.get("unitPrice", 0.0),
+                    "totalAmount": item.get("totalPrice", 0.0),
+                })
+        df = pd.DataFrame(rows, columns=["saleId", "saleDate", "productId", "productName",
+                                         "quantity", "unitPrice", "totalAmount"])
+        df["saleDate"] = pd.to_datetime(df["saleDate"], utc=True).dt.tz_localize(None)
+        return df
+    
+    @staticmethod
+    def load_from_mongodb(connection_string: str, collection: str, query: Optional[Dict] = None) -> pd.DataFrame:
         """Load data from MongoDB"""
-        # Placeholder - implement MongoDB data loading
-        return pd.DataFrame()
+        from pymongo import MongoClient
+
+        client = MongoClient(connection_string)
+        try:
+            db = client.get_default_database(os.getenv("MONGODB_DB_NAME", "enterprise-sales-ai"))
+            cursor = db[collection].find(query or {}, {"items": 1, "saleDate": 1}, batch_size=5000)
+            return DataLoader.optimize_dtypes(DataLoader.flatten_sales(list(cursor)))
+        finally:
+            client.close()
     
     @staticmethod
     def prepare_training_data(df: pd.DataFrame) -> Dict:
         """Prepare data for training"""
         # Placeholder - implement data preparation
         return {"X": [], "y": []}
-
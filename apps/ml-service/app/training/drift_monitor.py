@@ -0,0 +1,306 @@
+import re
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+from typing import Dict, List, Optional, Sequence
+from app.preprocessing.anomaly_detector import StreamingAnomalyDetector
+from app.preprocessing.feature_engineering import FeatureEngineer
+from app.training.evaluator import Evaluator
+
+DEFAULT_FEATURES = (
+    "quantity",
+    "quantity_lag_7",
+    "quantity_rolling_mean_7",
+    "quantity_anomaly_score",
+)
+ERROR_FEATURE = "forecast_error"
+# Days of history the lag and rolling features look back over
+LOOKBACK = 7
+
+class DriftMonitor:
+    """Incremental per-product feature and forecast-error drift detection"""
+
+    def __init__(self, features: Sequence[str] = DEFAULT_FEATURES, n_bins: int = 10,
+                 psi_threshold: float = 0.25, ks_threshold: float = 0.2,
+                 error_ratio_threshold: float = 1.5, min_count: int = 30):
+        self.features = list(features) + [ERROR_FEATURE]
+        self.n_bins = n_bins
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.error_ratio_threshold = error_ratio_threshold
+        self.min_count = min_count
+        # Bin edges per product: its own reference quantiles, fixed on its first reference batch
+        self.edges = np.full((0, len(self.features), n_bins - 1), np.nan)
+        self.products: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.categories: Dict[str, str] = {}
+        shape = (0, len(self.features), n_bins)
+        self.reference = np.zeros(shape, dtype=np.int32)
+        self.current = np.zeros(shape, dtype=np.int32)
+        self.reference_errors = np.zeros((0, 3))
+        self.current_errors = np.zeros((0, 3))
+        # Trailing daily sales per product (oldest first) and the day of the last one,
+        # kept with the anomaly detector so each batch continues the previous one
+        self.history = np.full((0, LOOKBACK), np.nan)
+        self.last_day = np.zeros(0, dtype=np.int64)
+        self.detector = StreamingAnomalyDetector()
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def build_features(self, df: pd.DataFrame, product_column: str = "productId", date_column: str = "date",
+                 value_column: str = "quantity", category_column: str = "category") -> pd.DataFrame:
+        """Per-product lag, rolling and anomaly features, continuing from the previous batch"""
+        days = pd.to_datetime(df[date_column]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        labels = df[product_column].astype(str).to_numpy()
+        daily = (pd.DataFrame({"product": labels, "day": days, "value": df[value_column].to_numpy(dtype=np.float64)})
+                 .groupby(["product", "day"], sort=True)["value"].sum())
+        span = daily.reset_index().groupby("product", sort=True)["day"].agg(["min", "max"])
+        products = span.index.to_numpy()
+        rows = self._rows(products)
+        # Continue from the day after the last one seen; 0 marks a product never seen
+        start = np.where(self.last_day[rows] > 0, self.last_day[rows] + 1, span["min"].to_numpy())
+        end = span["max"].to_numpy()
+        keep = end >= start
+        products, rows, start, end = products[keep], rows[keep], start[keep], end[keep]
+        feature_names = [f for f in self.features if f != ERROR_FEATURE]
+        if not len(rows):
+            return pd.DataFrame(columns=[product_column, date_column, *feature_names])
+
+        # Dense daily series per product: the LOOKBACK buffered days, then the new days
+        total = LOOKBACK + end - start + 1
+        owner = np.repeat(np.arange(len(rows)), total)
+        offset = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        day = np.repeat(start - LOOKBACK, total) + offset
+        is_new = offset >= LOOKBACK
+        values = np.empty(len(day))
+        values[~is_new] = self.history[rows].ravel()
+        values[is_new] = daily.reindex(pd.MultiIndex.from_arrays([products[owner[is_new]], day[is_new]])) \
+            .fillna(0.0).to_numpy()
+
+        frame = pd.DataFrame({product_column: products[owner], value_column: values})
+        frame = FeatureEngineer.create_lag_features(frame, value_column, [LOOKBACK], group_column=product_column)
+        frame = FeatureEngineer.create_rolling_features(frame, value_column, [LOOKBACK], group_column=product_column)
+        self.history[rows] = values[np.cumsum(total)[:, None] - np.arange(LOOKBACK, 0, -1)[None, :]]
+        self.last_day[rows] = end
+
+        frame = frame[is_new].reset_index(drop=True)
+        frame[date_column] = day[is_new].astype("datetime64[D]").astype("datetime64[ns]")
+        # Scores from the detector's warm-up are forced to 0; leave them out instead
+        seen = np.array([self.detector.count[self.detector.index[p]] if p in self.detector.index else 0
+                         for p in products])
+        warm = seen[owner[is_new]] + offset[is_new] - LOOKBACK >= self.detector.warmup
+        frame = FeatureEngineer.create_anomaly_features(frame, product_column, date_column, value_column,
+                                                        detector=self.detector)
+        score = f"{value_column}_anomaly_score"
+        frame[score] = np.where(warm, frame[score], np.nan)
+        if category_column in df:
+            categories = pd.Series(df[category_column].astype(str).to_numpy(), index=labels)
+            frame[category_column] = frame[product_column].map(categories[~categories.index.duplicated(keep="last")])
+        return frame
+
+    def _rows(self, product_ids) -> np.ndarray:
+        """Row index per product id, registering unseen products"""
+        labels = [str(p) for p in product_ids]
+        missing = list(dict.fromkeys(p for p in labels if p not in self.index))
+        if missing:
+            start = len(self.products)
+            self.products.extend(missing)
+            self.index.update({p: start + i for i, p in enumerate(missing)})
+            grow = np.zeros((len(missing), len(self.features), self.n_bins), dtype=np.int32)
+            self.edges = np.concatenate([self.edges, np.full((len(missing),) + self.edges.shape[1:], np.nan)])
+            self.history = np.concatenate([self.history, np.full((len(missing), LOOKBACK), np.nan)])
+            self.last_day = np.concatenate([self.last_day, np.zeros(len(missing), dtype=np.int64)])
+            self.reference = np.concatenate([self.reference, grow])
+            self.current = np.concatenate([self.current, grow])
+            self.reference_errors = np.concatenate([self.reference_errors, np.zeros((len(missing), 3))])
+            self.current_errors = np.concatenate([self.current_errors, np.zeros((len(missing), 3))])
+        return np.fromiter((self.index[p] for p in labels), dtype=np.int64, count=len(labels))
+
+    def _accumulate(self, rows: np.ndarray, feature: int, values: np.ndarray, reference: bool) -> None:
+        observed = ~np.isnan(values)
+        unset = observed & np.isnan(self.edges[rows, feature, 0])
+        if reference and unset.any():
+            quantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+            new = pd.Series(values[unset]).groupby(rows[unset]).quantile(quantiles)
+            new_rows = new.index.get_level_values(0).unique().to_numpy()
+            self.edges[new_rows, feature] = new.to_numpy().reshape(len(new_rows), -1)
+        # Products without reference edges (e.g. new since the reference) are not binned
+        observed &= ~np.isnan(self.edges[rows, feature, 0])
+        if not observed.any():
+            return
+        rows, values = rows[observed], values[observed]
+        # Edges at or below each value, i.e. searchsorted(side="right") against the product's edges
+        bins = (self.edges[rows, feature] <= values[:, None]).sum(axis=1)
+        flat = (rows * len(self.features) + feature) * self.n_bins + bins
+        target = self.reference if reference else self.current
+        cells, counts = np.unique(flat, return_counts=True)
+        target.reshape(-1)[cells] += counts.astype(np.int32)
+
+    def update(self, df: pd.DataFrame, reference: bool = False, product_column: str = "productId",
+               category_column: str = "category") -> None:
+        """Fold a batch of feature rows into the reference or current window"""
+        rows = self._rows(df[product_column].to_numpy())
+        if category_column in df:
+            self.categories.update(zip(df[product_column].astype(str), df[category_column].astype(str)))
+        for feature, name in enumerate(self.features):
+            if name in df:
+                self._accumulate(rows, feature, df[name].to_numpy(dtype=np.float64), reference)
+
+    def update_errors(self, product_ids, y_true, y_pred, reference: bool = False) -> None:
+        """Fold live (or validation, with ``reference``) forecast errors into the sketches"""
+        rows = self._rows(product_ids)
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        # Symmetric relative error, bounded in [-2, 2] and defined for zero sales
+        relative = (y_true - y_pred) / ((np.abs(y_true) + np.abs(y_pred)) / 2 + 1.0)
+        self._accumulate(rows, self.features.index(ERROR_FEATURE), relative, reference)
+        sums = Evaluator.grouped_error_sums(rows, len(self.products), y_true, y_pred)
+        if reference:
+            self.reference_errors += sums
+        else:
+            self.current_errors += sums
+
+    def _category_codes(self):
+        labels = np.array([self.categories.get(p, "unknown") for p in self.products])
+        names, codes = np.unique(labels, return_inverse=True)
+        return names, codes
+
+    def _dependence(self) -> np.ndarray:
+        """Per feature, how many consecutive rows share information (rolling windows overlap)"""
+        return np.array([float(re.search(r"_rolling_\w+_(\d+)$", name).group(1))
+                         if re.search(r"_rolling_\w+_(\d+)$", name) else 1.0 for name in self.features])
+
+    @staticmethod
+    def _drift_scores(reference: np.ndarray, current: np.ndarray, dependence: np.ndarray):
+        """PSI, binned KS and their sampling-noise levels over the last (bins) axis"""
+        n_bins = reference.shape[-1]
+        # Overlapping rolling windows carry fewer independent observations than rows
+        ref_total = reference.sum(axis=-1) / dependence
+        cur_total = current.sum(axis=-1) / dependence
+        reference, current = reference / dependence[:, None], current / dependence[:, None]
+        # Add-half smoothing keeps sparse bins from dominating PSI
+        p = (reference + 0.5) / (ref_total[..., None] + 0.5 * n_bins)
+        q = (current + 0.5) / (cur_total[..., None] + 0.5 * n_bins)
+        psi = ((q - p) * np.log(q / p)).sum(axis=-1)
+        ks = np.abs(np.cumsum(p - q, axis=-1)).max(axis=-1)
+        inverse_n = 1.0 / np.maximum(ref_total, 1) + 1.0 / np.maximum(cur_total, 1)
+        # PSI between two samples of one distribution is ~ chi2(bins - 1) * inverse_n; take its
+        # 99.9% quantile, and the 0.1% KS critical value, so per-product tests rarely fire on noise
+        occupied = ((reference + current) > 0).sum(axis=-1)
+        psi_noise = chi2.ppf(0.999, np.maximum(occupied - 1, 1)) * inverse_n
+        ks_critical = 1.95 * np.sqrt(inverse_n)
+        return psi, ks, psi_noise, ks_critical, np.minimum(ref_total, cur_total)
+
+    def scores(self, by: str = "product") -> pd.DataFrame:
+        """PSI/KS per feature and error ratios, one row per product or category"""
+        reference, current = self.reference.astype(np.float64), self.current.astype(np.float64)
+        reference_errors, current_errors = self.reference_errors, self.current_errors
+        labels = self.products
+        if by == "category":
+            labels, codes = self._category_codes()
+            # Only products seen in both windows, so a changed product mix is not drift
+            both = (reference.sum(axis=-1) > 0) & (current.sum(axis=-1) > 0)
+            both_errors = ((reference_errors[:, 0] > 0) & (current_errors[:, 0] > 0))[:, None]
+            reference = self._sum_by(codes, len(labels), reference * both[..., None])
+            current = self._sum_by(codes, len(labels), current * both[..., None])
+            reference_errors = self._sum_by(codes, len(labels), reference_errors * both_errors)
+            current_errors = self._sum_by(codes, len(labels), current_errors * both_errors)
+        elif by != "product":
+            raise ValueError(f"Unknown grouping: {by}")
+
+        psi, ks, psi_noise, ks_critical, counts = self._drift_scores(reference, current, self._dependence())
+        enough = counts >= self.min_count
+        psi, ks = np.where(enough, psi, np.nan), np.where(enough, ks, np.nan)
+        reference_mae = Evaluator.grouped_metrics(reference_errors)["mae"]
+        current_metrics = Evaluator.grouped_metrics(current_errors)
+        error_ratio = current_metrics["mae"] / np.where(reference_mae > 0, reference_mae, np.nan)
+        error_ratio = np.where(current_errors[:, 0] >= self.min_count, error_ratio, np.nan)
+
+        result = {}
+        for feature, name in enumerate(self.features):
+            result[f"{name}_psi"] = psi[:, feature]
+            result[f"{name}_ks"] = ks[:, feature]
+        result["mae"] = current_metrics["mae"]
+        result["rmse"] = current_metrics["rmse"]
+        result["error_ratio"] = error_ratio
+        result["max_psi"] = np.where(enough.any(axis=1), np.where(enough, psi, -np.inf).max(axis=1), np.nan)
+        result["drifted"] = (
+            (np.nan_to_num(psi - psi_noise) > self.psi_threshold).any(axis=1)
+            | (np.nan_to_num(ks) > np.maximum(self.ks_threshold, ks_critical)).any(axis=1)
+            | (np.nan_to_num(error_ratio) > self.error_ratio_threshold)
+        )
+        # Groups with too little data in every feature are undecided, not stable
+        result["sufficient"] = enough.any(axis=1)
+        return pd.DataFrame(result, index=pd.Index(list(labels), name=by))
+
+    @staticmethod
+    def _sum_by(codes: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+        totals = np.zeros((n_groups,) + values.shape[1:])
+        np.add.at(totals, codes, values)
+        return totals
+
+    def drifted_products(self) -> List[str]:
+        """Products to refit: drifted themselves, or sparse with a drifted category"""
+        products = self.scores("product")
+        selected = products["drifted"].to_numpy()
+        has_current = self.current.sum(axis=(1, 2)) > 0
+        sparse = ~products["sufficient"].to_numpy() & has_current
+        if sparse.any():
+            categories = self.scores("category")
+            drifted_categories = set(categories.index[categories["drifted"].to_numpy()])
+            in_drifted = np.array([self.categories.get(p, "unknown") in drifted_categories for p in self.products])
+            selected = selected | (sparse & in_drifted)
+        return [p for p, s in zip(self.products, selected) if s]
+
+    def rebaseline(self, product_ids: Optional[List[str]] = None) -> None:
+        """After refitting, make the current window the products' new reference"""
+        rows = self._rows(product_ids) if product_ids is not None else np.arange(len(self.products))
+        has_data = self.current[rows].sum(axis=(1, 2)) > 0
+        rows = rows[has_data]
+        self.reference[rows] = self.current[rows]
+        self.current[rows] = 0
+        with_errors = rows[self.current_errors[rows, 0] > 0]
+        self.reference_errors[with_errors] = self.current_errors[with_errors]
+        self.current_errors[with_errors] = 0
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """State as plain arrays, for saving next to model artifacts"""
+        return {
+            "params": np.array([self.n_bins, self.psi_threshold, self.ks_threshold,
+                                self.error_ratio_threshold, self.min_count], dtype=np.float64),
+            "features": np.array(self.features[:-1], dtype=str),
+            "products": np.array(self.products, dtype=str),
+            "categories": np.array([self.categories.get(p, "unknown") for p in self.products], dtype=str),
+            "edges": self.edges, "reference": self.reference, "current": self.current,
+            "reference_errors": self.reference_errors, "current_errors": self.current_errors,
+            "history": self.history, "last_day": self.last_day,
+            **{f"detector_{name}": value for name, value in self.detector.state_dict().items()},
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, np.ndarray]) -> "DriftMonitor":
+        """Rebuild a monitor from ``state_dict`` arrays"""
+        n_bins, psi_threshold, ks_threshold, error_ratio_threshold, min_count = state["params"]
+        monitor = cls([str(f) for f in state["features"]], int(n_bins), float(psi_threshold),
+                      float(ks_threshold), float(error_ratio_threshold), int(min_count))
+        monitor.products = [str(p) for p in state["products"]]
+        monitor.index = {p: i for i, p in enumerate(monitor.products)}
+        monitor.categories = dict(zip(monitor.products, (str(c) for c in state["categories"])))
+        for name in ("edges", "reference", "current", "reference_errors", "current_errors",
+                     "history", "last_day"):
+            setattr(monitor, name, np.asarray(state[name]))
+        monitor.detector = StreamingAnomalyDetector.from_state_dict(
+            {name[len("detector_"):]: value for name, value in state.items() if name.startswith("detector_")}
+        )
+        return monitor
+
+    def save(self, path: str) -> None:
+        """Save state as a compressed NumPy archive"""
+        np.savez_compressed(path, **self.state_dict())
+
+    @classmethod
+    def load(cls, path: str) -> "DriftMonitor":
+        """Load state saved with ``save``"""
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls.from_state_dict({name: artifact[name] for name in artifact.files})
@@ -23,6 +23,22 @@ class Evaluator:
         ss_tot = np.sum((y_true_arr - np.mean(y_true_arr)) ** 2)
         return 1 - (ss_res / ss_tot) if ss_tot != 0 else 0.0
     
+    @staticmethod
+    def grouped_error_sums(groups: np.ndarray, n_groups: int, y_true, y_pred) -> np.ndarray:
+        """Per-group (count, sum |error|, sum error^2) for integer group codes"""
+        error = np.asarray(y_true, dtype=np.float64) - np.asarray(y_pred, dtype=np.float64)
+        return np.stack([
+            np.bincount(groups, minlength=n_groups).astype(np.float64),
+            np.bincount(groups, weights=np.abs(error), minlength=n_groups),
+            np.bincount(groups, weights=error ** 2, minlength=n_groups),
+        ], axis=1)
+    
+    @staticmethod
+    def grouped_metrics(sums: np.ndarray) -> Dict[str, np.ndarray]:
+        """MAE and RMSE per group from ``grouped_error_sums`` (NaN for empty groups)"""
+        count = np.where(sums[:, 0] > 0, sums[:, 0], np.nan)
+        return {"mae": sums[:, 1] / count, "rmse": np.sqrt(sums[:, 2] / count)}
+    
     def evaluate(self, y_true: List[float], y_pred: List[float]) -> Dict:
         """Comprehensive evaluation"""
         return {
@@ -0,0 +1,258 @@
+import asyncio
+import datetime
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import numpy as np
+from app.agentic_ai.tools.sales_cube import SalesCube
+from app.training.data_loader import DataLoader
+from app.utils.logger import setup_logger
+
+logger = setup_logger("sales_consumer")
+
+ProductsCallback = Callable[[List[str]], Awaitable[None]]
+
+# Server error codes: change streams unsupported (standalone server / pre-3.6), and resume point gone
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+RESUME_POINT_LOST = {260, 280, 286}
+
+class SalesChangeConsumer:
+    """Tail new sales from MongoDB into the sales cube and queue the affected products for refit"""
+
+    def __init__(self, connection_string: Optional[str] = None, collection: str = "sales",
+                 sales_cube: Optional[SalesCube] = None,
+                 batch_size: int = 500, flush_interval: float = 2.0, poll_interval: float = 10.0,
+                 state_path: Optional[str] = None, checkpoint_interval: float = 60.0,
+                 retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        self.connection_string = connection_string or os.getenv("MONGODB_URI", "mongodb://localhost:27017/enterprise-sales-ai")
+        self.collection_name = collection
+        self.sales_cube = sales_cube if sales_cube is not None else SalesCube()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.state_path = state_path or os.path.join(os.getenv("ML_MODEL_PATH", "./saved_models"), "sales_consumer_state.npz")
+        self.checkpoint_interval = checkpoint_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.pending_refits: Set[str] = set()
+        self.listeners: List[ProductsCallback] = []
+        self.resume_token: Optional[Dict] = None
+        # Cluster time to open the first change stream at, right after the bootstrap
+        self.start_at: Optional[Any] = None
+        # _id of the last polled sale
+        self.watermark: Optional[Any] = None
+        # False until the history has been folded into the cube
+        self.bootstrapped = False
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self._checkpointed = 0.0
+        self._delay = retry_delay
+        self._load_state()
+
+    def add_listener(self, callback: ProductsCallback) -> None:
+        """Register an async callback receiving the product ids of each batch"""
+        self.listeners.append(callback)
+
+    def drain_refits(self) -> List[str]:
+        """Take the products queued for refit since the last drain"""
+        products, self.pending_refits = sorted(self.pending_refits), set()
+        return products
+
+    async def process_batch(self, documents: List[Dict]) -> List[str]:
+        """Fold a batch of newly inserted sale documents into the sales cube"""
+        rows = DataLoader.flatten_sales(documents)
+        if rows.empty:
+            return []
+        await asyncio.to_thread(self._fold, rows)
+        products = sorted(rows["productId"].unique())
+        await self._touch(products)
+        logger.info(f"Processed {len(documents)} sales touching {len(products)} products")
+        return products
+
+    async def process_edits(self, documents: List[Dict]) -> List[str]:
+        """Queue refits for the products of edited sales without re-adding them"""
+        products = sorted({str(item["productId"]) for doc in documents for item in doc.get("items", [])})
+        if products:
+            await self._touch(products)
+            logger.info(f"Queued refits for {len(products)} products from {len(documents)} edited sales")
+        return products
+
+    def _fold(self, rows) -> None:
+        self.sales_cube.update(rows)
+
+    async def _touch(self, products: List[str]) -> None:
+        self.pending_refits.update(products)
+        for callback in self.listeners:
+            try:
+                await callback(products)
+            except Exception as e:
+                logger.error(f"Sales listener failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start consuming in the background on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the background consumer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _collection(self):
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        if self._client is None:
+            self._client = AsyncIOMotorClient(self.connection_string)
+        db = self._client.get_default_database(os.getenv("MONGODB_DB_NAME", "enterprise-sales-ai"))
+        return db[self.collection_name]
+
+    async def run(self) -> None:
+        """Consume via change stream, falling back to watermark polling; retries errors with backoff"""
+        from pymongo.errors import OperationFailure
+
+        collection = self._collection()
+        polling = False
+        while True:
+            try:
+                if not self.bootstrapped:
+                    await self._bootstrap(collection)
+                if polling:
+                    await self._poll(collection)
+                else:
+                    await self._watch(collection)
+                continue
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning(f"Change streams unsupported ({e.code}), polling instead")
+                    polling = True
+                    continue
+                if e.code in RESUME_POINT_LOST:
+                    # Sales since the checkpoint are unknown: rebuild the cube from the collection
+                    logger.warning(f"Change stream cannot resume ({e.code}), rebuilding from history")
+                    self.resume_token = None
+                    self.bootstrapped = False
+                    continue
+                logger.error(f"Sales consumer error ({e.code}): {str(e)}; retrying in {self._delay:.0f}s")
+            except Exception as e:
+                logger.error(f"Sales consumer error: {str(e)}; retrying in {self._delay:.0f}s")
+            await asyncio.sleep(self._delay)
+            self._delay = min(self._delay * 2, self.max_retry_delay)
+
+    async def _bootstrap(self, collection) -> None:
+        """Rebuild the cube from every sale stored so far and start following from that point"""
+        from bson import ObjectId, Timestamp
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        boundary = ObjectId.from_datetime(now)
+        self.sales_cube.reset()
+        cursor = collection.find({"_id": {"$lt": boundary}}, {"items": 1, "saleDate": 1})
+        batch: List[Dict] = []
+        count = 0
+        async for doc in cursor.batch_size(5000):
+            batch.append(doc)
+            if len(batch) >= 5000:
+                await asyncio.to_thread(self._fold, DataLoader.flatten_sales(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._fold, DataLoader.flatten_sales(batch))
+            count += len(batch)
+        # Later sales are read from the boundary on, by either mode
+        self.watermark = boundary
+        self.start_at = Timestamp(int(now.timestamp()), 0)
+        self.resume_token = None
+        self.bootstrapped = True
+        self._checkpoint(force=True)
+        logger.info(f"Loaded {count} historical sales into the sales cube")
+
+    async def _watch(self, collection) -> None:
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        position = {"resume_after": self.resume_token} if self.resume_token else {"start_at_operation_time": self.start_at}
+        async with collection.watch(pipeline, full_document="updateLookup", **position) as stream:
+            logger.info("Tailing sales change stream")
+            self._delay = self.retry_delay
+            inserted: List[Dict] = []
+            edited: List[Dict] = []
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None and change.get("fullDocument"):
+                    batch = inserted if change["operationType"] == "insert" else edited
+                    batch.append(change["fullDocument"])
+                now = asyncio.get_running_loop().time()
+                pending = len(inserted) + len(edited)
+                if pending and (pending >= self.batch_size or now >= deadline):
+                    await self.process_batch(inserted)
+                    await self.process_edits(edited)
+                    inserted, edited = [], []
+                    self.resume_token = stream.resume_token
+                    self._checkpoint()
+                if now >= deadline:
+                    deadline = now + self.flush_interval
+                if change is None:
+                    await asyncio.sleep(0.1)
+
+    async def _poll(self, collection) -> None:
+        from bson import ObjectId
+
+        if isinstance(self.watermark, datetime.datetime):
+            self.watermark = ObjectId.from_datetime(self.watermark)
+        while True:
+            # _id only grows with inserts, so edited sales are not re-read and double-counted
+            cursor = collection.find({"_id": {"$gt": self.watermark}}).sort("_id", 1)
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    await self._flush_polled(batch)
+                    batch = []
+            if batch:
+                await self._flush_polled(batch)
+            self._delay = self.retry_delay
+            await asyncio.sleep(self.poll_interval)
+
+    async def _flush_polled(self, batch: List[Dict]) -> None:
+        await self.process_batch(batch)
+        self.watermark = batch[-1]["_id"]
+        self._checkpoint()
+
+    def _load_state(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+        from bson import json_util
+
+        with np.load(self.state_path, allow_pickle=False) as artifact:
+            state = json_util.loads(str(artifact["position"]))
+            cube = {name[len("cube_"):]: artifact[name] for name in artifact.files if name.startswith("cube_")}
+        self.sales_cube = SalesCube.from_state_dict(cube)
+        self.resume_token = state.get("resume_token")
+        self.start_at = state.get("start_at")
+        self.watermark = state.get("watermark")
+        self.bootstrapped = True
+
+    def _checkpoint(self, force: bool = False) -> None:
+        """Save the cube with the stream position it reflects, at most every ``checkpoint_interval`` seconds"""
+        now = asyncio.get_running_loop().time()
+        if not force and now - self._checkpointed < self.checkpoint_interval:
+            return
+        from bson import json_util
+
+        position = json_util.dumps({"resume_token": self.resume_token, "start_at": self.start_at,
+                                    "watermark": self.watermark})
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        # Replace atomically: a crash mid-write must not leave a cube that disagrees with its position
+        partial = f"{self.state_path}.partial"
+        with open(partial, "wb") as f:
+            np.savez_compressed(f, position=np.array(position),
+                                **{f"cube_{name}": value for name, value in self.sales_cube.state_dict().items()})
+        os.replace(partial, self.state_path)
+        self._checkpointed = now
@@ -0,0 +1,136 @@
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, Optional
+
+class SyntheticSalesGenerator:
+    """Generate realistic seasonal daily sales for load testing and benchmarks"""
+
+    CATEGORIES = {
+        "Electronics": (50.0, 1500.0),
+        "Furniture": (80.0, 1200.0),
+        "Stationery": (2.0, 40.0),
+        "Clothing": (10.0, 120.0),
+        "Groceries": (1.0, 25.0),
+        "Home": (10.0, 200.0),
+    }
+
+    # (month, day) -> demand multiplier
+    HOLIDAYS = {
+        (1, 1): 0.6,
+        (2, 14): 1.4,
+        (7, 4): 1.3,
+        (11, 28): 2.5,
+        (12, 24): 1.8,
+        (12, 25): 0.4,
+        (12, 31): 1.3,
+    }
+
+    def __init__(self, n_products: int = 100, n_days: int = 365,
+                 start_date: Optional[datetime.date] = None, seed: int = 42,
+                 promo_rate: float = 1 / 60, promo_length: int = 5, promo_lift: float = 1.6):
+        self.n_products = n_products
+        self.n_days = n_days
+        self.start_date = start_date or (datetime.date.today() - datetime.timedelta(days=n_days))
+        self.seed = seed
+        self.promo_rate = promo_rate
+        self.promo_length = promo_length
+        self.promo_lift = promo_lift
+        self.dates = pd.date_range(self.start_date, periods=n_days, freq="D")
+        self._calendar = self._calendar_multiplier()
+
+    def _calendar_multiplier(self) -> np.ndarray:
+        """Weekly, yearly and holiday seasonality shared by all products"""
+        day_of_week = self.dates.dayofweek.to_numpy()
+        weekly = np.where(day_of_week >= 5, 1.35, 1.0) * (1 + 0.05 * np.sin(2 * np.pi * day_of_week / 7))
+        day_of_year = self.dates.dayofyear.to_numpy()
+        yearly = 1 + 0.25 * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+        holiday = np.ones(self.n_days)
+        month, day = self.dates.month.to_numpy(), self.dates.day.to_numpy()
+        for (m, d), lift in self.HOLIDAYS.items():
+            holiday[(month == m) & (day == d)] = lift
+        # Pre-Christmas ramp
+        holiday[(month == 12) & (day >= 10) & (day < 24)] *= 1.3
+        return weekly * yearly * holiday
+
+    def generate_products(self) -> pd.DataFrame:
+        """Generate the product catalog"""
+        rng = np.random.default_rng(self.seed)
+        names = list(self.CATEGORIES)
+        category = rng.choice(names, size=self.n_products)
+        low = np.array([self.CATEGORIES[c][0] for c in category])
+        high = np.array([self.CATEGORIES[c][1] for c in category])
+        price = np.round(np.exp(rng.uniform(np.log(low), np.log(high))), 2)
+        return pd.DataFrame({
+            "productId": [f"SYN{i:06d}" for i in range(self.n_products)],
+            "name": [f"{c} Item {i}" for i, c in enumerate(category)],
+            "category": category,
+            "price": price,
+            "costPrice": np.round(price * rng.uniform(0.5, 0.8, self.n_products), 2),
+            "stock": rng.integers(20, 500, self.n_products),
+        })
+
+    def _sales_block(self, products: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+        """Generate daily sales for a block of products"""
+        n = len(products)
+        # Cheaper products sell more units
+        base = rng.lognormal(mean=np.log(40.0 / np.sqrt(products["price"].to_numpy())), sigma=0.4)
+        slope = rng.normal(0.0, 0.5, n) / 365.0
+        t = np.arange(self.n_days)
+        trend = np.clip(1 + slope[:, None] * t[None, :], 0.1, None)
+
+        starts = rng.random((n, self.n_days)) < self.promo_rate
+        active = np.cumsum(starts, axis=1)
+        active[:, self.promo_length:] -= active[:, :-self.promo_length].copy()
+        promotion = active > 0
+
+        rate = base[:, None] * trend * self._calendar[None, :] * np.where(promotion, self.promo_lift, 1.0)
+        quantity = rng.poisson(rate).astype(np.int32)
+
+        price = products["price"].to_numpy()
+        unit_price = np.where(promotion, np.round(price[:, None] * 0.85, 2), price[:, None]).astype(np.float32)
+        return pd.DataFrame({
+            "date": np.tile(self.dates.to_numpy(), n),
+            "productId": np.repeat(products["productId"].to_numpy(), self.n_days),
+            "category": np.repeat(products["category"].to_numpy(), self.n_days),
+            "quantity": quantity.ravel(),
+            "unitPrice": unit_price.ravel(),
+            "totalAmount": (quantity * unit_price).astype(np.float32).ravel(),
+            "promotion": promotion.ravel(),
+        })
+
+    def iter_daily_sales(self, products: Optional[pd.DataFrame] = None,
+                         chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """Yield daily sales (one row per product-day) in chunks of products"""
+        if products is None:
+            products = self.generate_products()
+        rng = np.random.default_rng(self.seed + 1)
+        for start in range(0, len(products), chunk_size):
+            yield self._sales_block(products.iloc[start:start + chunk_size], rng)
+
+    def write_csv(self, path: str, chunk_size: int = 1000) -> Dict:
+        """Write the generated daily sales to a CSV file"""
+        rows = 0
+        for i, chunk in enumerate(self.iter_daily_sales(chunk_size=chunk_size)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+        return {"path": path, "rows": rows}
+
+    def write_parquet(self, path: str, chunk_size: int = 1000) -> Dict:
+        """Write the generated daily sales to a Parquet file"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = 0
+        writer = None
+        try:
+            for chunk in self.iter_daily_sales(chunk_size=chunk_size):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return {"path": path, "rows": rows}
@@ -1,31 +1,66 @@
-from typing import Dict
+import asyncio
+import os
+from typing import Dict, List, Optional
+from app.inference.model_store import reload_served
 from app.models.prophet_model import ProphetModel
 from app.models.xgboost_model import XGBoostModel
 from app.models.lstm_model import LSTMModel
 
+ARTIFACTS = {
+    "prophet": "prophet_model.json",
+    "xgboost": "xgboost_model.pkl",
+    "lstm": "lstm_model.npz",
+}
+
+# Models fitted independently per product, so a subset can be refit alone
+PER_PRODUCT = {"prophet"}
+
 class Trainer:
     """Trainer class for ML models"""
     
     def __init__(self):
+        self.model_path = os.getenv("ML_MODEL_PATH", "./saved_models")
         self.models = {
             "prophet": ProphetModel(),
             "xgboost": XGBoostModel(),
             "lstm": LSTMModel(),
         }
     
-    async def train_model(self, model_type: str, data_path: str = None) -> Dict:
-        """Train a specific model type"""
+    async def train_model(self, model_type: str, data_path: str = None,
+                          product_ids: Optional[List[str]] = None) -> Dict:
+        """Train a specific model type, optionally refitting only some products"""
         if model_type not in self.models:
             raise ValueError(f"Unknown model type: {model_type}")
+        if product_ids and model_type not in PER_PRODUCT:
+            # A global model refit on a subset would drop every other product
+            raise ValueError(f"{model_type} is not a per-product model; product_ids needs one of: "
+                             f"{', '.join(sorted(PER_PRODUCT))}")
         
         model = self.models[model_type]
         # Load data from data_path if provided
         data = {"data_path": data_path} if data_path else {}
+        if product_ids:
+            data["product_ids"] = product_ids
+        model_path = os.path.join(self.model_path, ARTIFACTS[model_type])
+        if data_path and model_type == "prophet" and os.path.exists(model_path):
+            # Warm-start refits from the parameters stored with the last fit
+            model.load(model_path)
         
-        result = model.train(data)
+        try:
+            # Fit off the event loop so training does not stall forecast requests
+            result = await asyncio.to_thread(model.train, data)
+            if data_path:
+                model.save(model_path)
+                if model_type == "prophet":
+                    # Serve the new fit right away
+                    await asyncio.to_thread(reload_served, model_path)
+        finally:
+            if model_type == "prophet":
+                # The model store serves the saved fit; keep no second copy of every product here
+                model.unload()
         
         return {
             "accuracy": result.get("accuracy", 0.0),
-            "model_path": f"./saved_models/{model_type}_model.pkl"
+            "model_path": model_path
         }
 
@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.admission import AdmissionController, AdmissionMiddleware, PoolConfig
 from app.api.routes import prediction, training, agentic_ai
+from app.inference.model_store import shared_model_store
+from app.training.sales_consumer import SalesChangeConsumer
+import os
 import uvicorn
 
 app = FastAPI(
@@ -9,8 +13,25 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admission control: per-endpoint concurrency pools, forecasts served first.
+# Only model fits go through the training pool; cheap training reads are not queued.
+# Added before CORS so shed responses still carry CORS headers.
+admission = AdmissionController({
+    "forecast": PoolConfig.from_env("forecast", limit=32, max_queue=256, queue_timeout=1.0, priority=0),
+    "ai": PoolConfig.from_env("ai", limit=8, max_queue=32, queue_timeout=5.0, priority=1),
+    "training": PoolConfig.from_env("training", limit=1, max_queue=2, queue_timeout=2.0, priority=2),
+})
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    routes=[
+        ("/api/v1/predictions", "forecast"),
+        ("/api/v1/ai", "ai"),
+        ("/api/v1/training/train", "training"),
+    ],
+)
+
 # CORS configuration (use env in production, e.g. CORS_ORIGINS=https://yourapp.vercel.app)
-import os
 _cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001").split(",")
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +46,25 @@ app.include_router(prediction.router, prefix="/api/v1/predictions", tags=["predi
 app.include_router(training.router, prefix="/api/v1/training", tags=["training"])
 app.include_router(agentic_ai.router, prefix="/api/v1/ai", tags=["agentic-ai"])
 
+# Incremental refresh from new MongoDB sales (opt-in: needs MONGODB_URI)
+@app.on_event("startup")
+async def start_sales_consumer():
+    app.state.sales_consumer = None
+    if os.getenv("ENABLE_SALES_CONSUMER", "false").lower() == "true":
+        app.state.sales_consumer = SalesChangeConsumer()
+        # The consumer restores the cube from its checkpoint (or builds it from history); the agent reads it
+        agentic_ai.agent.sales_cube = app.state.sales_consumer.sales_cube
+        app.state.sales_consumer.start()
+
+@app.on_event("shutdown")
+async def stop_sales_consumer():
+    if app.state.sales_consumer is not None:
+        await app.state.sales_consumer.stop()
+
+@app.on_event("shutdown")
+async def stop_model_workers():
+    shared_model_store().close()
+
 @app.get("/")
 async def root():
     return {"message": "Enterprise Sales AI ML Service", "status": "running"}
@@ -33,6 +73,11 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """Queue depth, in-flight and shed counts per admission pool"""
+    return admission.metrics()
+
 if __name__ == "__main__":
     import os
     port = int(os.getenv("PORT", 8000))
@@ -0,0 +1,78 @@
+import pytest
+
+class FakeCursor:
+    """Async cursor over in-memory documents"""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def batch_size(self, size):
+        return self
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        docs = list(self.docs)
+        for field, order in reversed(keys):
+            # Missing fields sort last without comparing None to values
+            docs.sort(key=lambda doc: (doc.get(field) is None, doc.get(field)), reverse=order < 0)
+        return FakeCursor(docs)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+def _matches(doc, query) -> bool:
+    for field, condition in (query or {}).items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            if not {
+                "$eq": lambda: value == operand,
+                "$ne": lambda: value != operand,
+                "$in": lambda: value in operand,
+                "$lt": lambda: value < operand,
+                "$gt": lambda: value > operand,
+            }[op]():
+                return False
+    return True
+
+class FakeCollection:
+    """In-memory stand-in for a Motor collection; ``aggregated`` is what any pipeline returns"""
+
+    def __init__(self, docs=(), aggregated=()):
+        self.docs = list(docs)
+        self.aggregated = list(aggregated)
+        # bulk_write calls as (operations, ordered)
+        self.writes = []
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(doc for doc in self.docs if _matches(doc, query))
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    def aggregate(self, pipeline):
+        return FakeCursor(self.aggregated)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one(query)
+        if doc is None and upsert:
+            doc = dict(query)
+            self.docs.append(doc)
+        if doc is not None:
+            doc.update(update["$set"])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append((operations, ordered))
+
+@pytest.fixture
+def fake_collection():
+    """Factory for in-memory Motor collections"""
+    return FakeCollection
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from app.api.admission import AdmissionController, AdmissionMiddleware, Overloaded, PoolConfig
+
+def make_controller(total_limit=1):
+    return AdmissionController({
+        "forecast": PoolConfig(limit=1, max_queue=4, queue_timeout=1.0, priority=0),
+        "training": PoolConfig(limit=1, max_queue=1, queue_timeout=1.0, priority=2),
+    }, total_limit=total_limit)
+
+
+@pytest.mark.asyncio
+async def test_admission_prioritizes_forecasts_and_sheds():
+    """Test freed slots go to forecasts first and full queues shed"""
+    controller = make_controller()
+    held = await controller.acquire("training")
+
+    order = []
+
+    async def request(pool):
+        admitted_at = await controller.acquire(pool)
+        order.append(pool)
+        controller.release(pool, admitted_at)
+
+    queued_training = asyncio.create_task(request("training"))
+    await asyncio.sleep(0)
+    queued_forecast = asyncio.create_task(request("forecast"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as shed:
+        await controller.acquire("training")
+    assert shed.value.reason == "queue_full"
+    assert shed.value.retry_after >= 1
+
+    metrics = controller.metrics()
+    assert metrics["pools"]["forecast"]["queue_depth"] == 1
+    assert metrics["pools"]["training"]["shed"] == 1
+
+    controller.release("training", held)
+    await asyncio.gather(queued_training, queued_forecast)
+    assert order == ["forecast", "training"]
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_middleware_returns_503_with_retry_after():
+    """Test shed requests get a fast 503 with Retry-After"""
+    import httpx
+
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    controller = AdmissionController({
+        "training": PoolConfig(limit=1, max_queue=0, queue_timeout=1.0, priority=2),
+    }, total_limit=4)
+    middleware = AdmissionMiddleware(app, controller, [("/api/v1/training", "training")])
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/api/v1/training/train"))
+        await asyncio.sleep(0.05)
+        shed = await client.post("/api/v1/training/train")
+        release.set()
+        assert (await first).status_code == 200
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert controller.metrics()["pools"]["training"]["shed_reasons"] == {"queue_full": 1}
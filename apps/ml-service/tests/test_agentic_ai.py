@@ -0,0 +1,134 @@
+import pytest
+from app.agentic_ai.agent import SalesAIAgent
+
+class OfflineLLMClient:
+    """LLM stub that behaves like an unreachable Ollama server"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt: str, context: dict = {}) -> str:
+        self.prompts.append(prompt)
+        return "Error connecting to AI model: offline"
+
+@pytest.mark.asyncio
+async def test_agent_runs_tools_for_top_products():
+    """Test the agent plans and runs tools without a usable LLM plan"""
+    agent = SalesAIAgent()
+    agent.llm_client = OfflineLLMClient()
+    sales = [
+        {"productId": f"p{i % 5}", "totalAmount": float(10 * (i % 5) + 1)}
+        for i in range(50)
+    ]
+    result = await agent.process_query("Analyze my top 3 products", {"sales": sales})
+
+    answer_prompt = agent.llm_client.prompts[-1]
+    for product_id in ["p4", "p3", "p2"]:
+        assert f'"product_id":"{product_id}"' in answer_prompt
+    assert "top_products" in result["reasoning"]
+    assert "forecast" in result["reasoning"]
+
+@pytest.mark.asyncio
+async def test_agent_planner_respects_deadline_and_clamps_days():
+    """Test a slow planner falls back within the deadline and forecast horizons are bounded"""
+    import asyncio
+    import time
+
+    class SlowLLMClient(OfflineLLMClient):
+        async def generate(self, prompt: str, context: dict = {}) -> str:
+            await asyncio.sleep(10)
+            return "[]"
+
+    class RecordingForecastTool:
+        def __init__(self):
+            self.days = []
+
+        async def generate_forecast(self, product_id: str, forecast_days: int = 30) -> dict:
+            self.days.append(forecast_days)
+            return {"predictions": [1.0] * forecast_days, "confidence_intervals": []}
+
+    agent = SalesAIAgent()
+    agent.llm_client = SlowLLMClient()
+    agent.forecast_tool = RecordingForecastTool()
+    start = time.monotonic()
+    calls = await agent._plan("forecast p1 for 30 days", {"product_ids": ["p1"]}, None, [],
+                              deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - start < 1.0
+    assert calls == [{"tool": "forecast", "args": {"product_id": "p1", "days": 30}}]
+
+    summary = await agent._forecast({"product_id": "p1", "days": 100000}, None, None)
+    assert agent.forecast_tool.days == [agent.max_forecast_days]
+    assert summary["days"] == agent.max_forecast_days
+
+def test_sales_cube_incremental_trend_stats():
+    """Test cube aggregates match a full rebuild and detect an upward trend"""
+    import pandas as pd
+    from app.agentic_ai.tools.sales_cube import SalesCube
+
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    sales = pd.DataFrame({
+        "saleDate": list(dates) * 2,
+        "productId": ["a"] * 60 + ["b"] * 60,
+        "category": ["X"] * 60 + ["Y"] * 60,
+        "totalAmount": [10.0 + i for i in range(60)] + [50.0] * 60,
+    })
+    incremental = SalesCube()
+    incremental.update(sales.iloc[:70])
+    incremental.update(sales.iloc[70:])
+    full = SalesCube()
+    full.update(sales)
+
+    stats = incremental.trend_stats("day", "product")
+    assert stats.loc["a", "slope"] == pytest.approx(1.0)
+    assert stats.loc["b", "slope"] == pytest.approx(0.0)
+    assert stats["total_sales"].to_dict() == full.trend_stats("day", "product")["total_sales"].to_dict()
+    assert incremental.summary("month", "category", "Y")["total_sales"] == pytest.approx(3000.0)
+    cells = incremental.cells["day"]
+    assert isinstance(cells["productId"].dtype, pd.CategoricalDtype)
+    assert len(cells) == 120 and len(incremental) == 120
+
+
+@pytest.mark.asyncio
+async def test_explanations_skip_unchanged_forecasts_and_serve_agent(fake_collection):
+    """Test precomputed explanations are reused until the forecast changes"""
+    from app.agentic_ai.explanations import ExplanationPrecomputer, ExplanationStore
+
+    class CountingLLMClient:
+        model_name = "test-model"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def complete(self, prompt: str, timeout: float = 60.0) -> str:
+            self.calls += 1
+            return f"explanation {self.calls}"
+
+    agent = SalesAIAgent()
+    forecast = await agent.forecast_tool.generate_forecast("p1", 3)
+    points = [
+        {"productId": p, "predicted": value, "lower": interval["lower"], "upper": interval["upper"]}
+        for p in ("p1", "p2")
+        for value, interval in zip(forecast["predictions"], forecast["confidence_intervals"])
+    ]
+    db = {
+        "sales": fake_collection(aggregated=[{"_id": "p1"}, {"_id": "p2"}, {"_id": "p3"}]),
+        "forecasts": fake_collection(points),
+        "forecast_explanations": fake_collection(),
+    }
+    llm = CountingLLMClient()
+    precomputer = ExplanationPrecomputer(db=db, llm_client=llm, concurrency=2)
+
+    progress = []
+    first = await precomputer.run(top_n=3, progress=progress.append)
+    assert first == {"total": 3, "generated": 2, "skipped": 0, "failed": 0, "missing_forecast": 1}
+    assert progress[-1]["generated"] == 2
+
+    second = await precomputer.run(top_n=3)
+    assert second["generated"] == 0 and second["skipped"] == 2
+    assert llm.calls == 2
+
+    agent.llm_client = llm
+    agent.explanations = ExplanationStore(db=db)
+    result = await agent.explain_forecast("p1", 3)
+    assert result["precomputed"] is True
+    assert result["explanation"].startswith("explanation")
@@ -9,3 +9,158 @@ async def test_predict_sales():
     assert "predictions" in result
     assert len(result["predictions"]) == 30
 
+
+@pytest.mark.asyncio
+async def test_predictors_share_models_reloaded_after_save(tmp_path):
+    """Test predictors read one model store that picks up a newly saved artifact"""
+    from app.inference.model_store import ModelStore
+    from app.models.prophet_model import ProphetModel
+    from app.training.synthetic_data import SyntheticSalesGenerator
+
+    store = ModelStore(str(tmp_path))
+    first, second = Predictor(models=store), Predictor(models=store)
+    assert store.prophet() is None
+
+    sales = next(SyntheticSalesGenerator(n_products=2, n_days=90, seed=5).iter_daily_sales())
+    trained = ProphetModel(workers=1)
+    trained.train({"sales": sales[sales["productId"] == "SYN000000"]})
+    trained.save(store.prophet_path)
+    result = await first.predict_sales("SYN000000", 7)
+    loaded = store.prophet()
+    assert sorted(loaded.model) == ["SYN000000"]
+    assert result["predictions"] != [100 + 2 * i for i in range(7)]
+
+    trained.train({"sales": sales})
+    trained.save(store.prophet_path)
+    store.reload()
+    assert store.prophet() is not loaded
+    assert sorted(store.prophet().model) == ["SYN000000", "SYN000001"]
+    assert len((await second.predict_sales("SYN000001", 7))["predictions"]) == 7
+    store.close()
+
+@pytest.mark.asyncio
+async def test_request_batcher_coalesces_and_dedupes():
+    """Test concurrent requests share one batched model call"""
+    import asyncio
+    from app.inference.request_batcher import RequestBatcher
+
+    class CountingPredictor(Predictor):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        async def predict_sales_batch(self, requests):
+            self.batches.append(list(requests))
+            return await super().predict_sales_batch(requests)
+
+    predictor = CountingPredictor()
+    batcher = RequestBatcher(predictor=predictor, max_batch_size=10, max_wait_ms=5)
+    results = await asyncio.gather(
+        batcher.predict_sales("a", 7),
+        batcher.predict_sales("b", 14),
+        batcher.predict_sales("a", 7),
+    )
+    assert len(predictor.batches) == 1
+    assert sorted(predictor.batches[0]) == [("a", 7), ("b", 14)]
+    assert len(results[0]["predictions"]) == 7
+    assert len(results[1]["predictions"]) == 14
+    assert results[0] is results[2]
+
+    class ShortPredictor(Predictor):
+        async def predict_sales_batch(self, requests):
+            return (await super().predict_sales_batch(requests))[:1]
+
+    short = RequestBatcher(predictor=ShortPredictor(), max_batch_size=10, max_wait_ms=1)
+    answered, missing = await asyncio.wait_for(asyncio.gather(
+        short.predict_sales("a", 7), short.predict_sales("b", 7), return_exceptions=True
+    ), timeout=1)
+    assert len(answered["predictions"]) == 7
+    assert isinstance(missing, RuntimeError)
+
+@pytest.mark.asyncio
+async def test_forecast_store_streams_unordered_upserts(fake_collection):
+    """Test catalog scoring writes chunked unordered upserts per (product, date)"""
+    import datetime
+    import numpy as np
+    from app.inference.batch_predictor import BatchPredictor
+    from app.inference.forecast_store import ForecastStore
+
+    class PartlyTrainedPredictor(Predictor):
+        def _predict_prophet(self, product_ids, forecast_days, start_date=None):
+            rows = [i for i, p in enumerate(product_ids) if p != "p4"]
+            values = np.ones((len(rows), forecast_days))
+            return rows, (values, values * 0.5, values * 2)
+
+    db = {"products": fake_collection({"_id": f"p{i}"} for i in range(6)), "forecasts": fake_collection()}
+    batch_predictor = BatchPredictor(chunk_size=2)
+    batch_predictor.predictor = PartlyTrainedPredictor()
+    store = ForecastStore(db=db, batch_predictor=batch_predictor, write_batch_size=7)
+    result = await store.run(forecast_days=3, start_date=datetime.date(2024, 1, 1))
+
+    # p4 has no model: no placeholder points are written for it
+    assert result["products"] == 5
+    assert result["untrained"] == 1
+    assert result["points"] == 15
+    assert not any(ordered for _, ordered in db["forecasts"].writes)
+    upserts = [op for batch, _ in db["forecasts"].writes for op in batch if type(op).__name__ == "UpdateOne"]
+    assert len(upserts) == 15
+    assert "p4" not in {op._filter["productId"] for op in upserts}
+    assert max(len(batch) for batch, _ in db["forecasts"].writes) <= 7
+
+def test_replenishment_optimizer_orders_below_reorder_point():
+    """Test vectorized (s, S) planning orders only products below their reorder point"""
+    import numpy as np
+    from app.inference.replenishment import ReplenishmentOptimizer
+
+    forecast = np.full((3, 14), 10.0)
+    plan = ReplenishmentOptimizer().plan(
+        forecast, forecast * 0.8, forecast * 1.2,
+        current_stock=np.array([0.0, 50.0, 500.0]),
+        lead_time_days=np.array([7, 7, 7]),
+        unit_cost=np.array([5.0, 5.0, 5.0]),
+        sale_price=np.array([8.0, 8.0, 8.0]),
+        review_period_days=7
+    )
+    assert plan["reorder_point"][0] > 70.0
+    assert plan["needs_order"].tolist() == [True, True, False]
+    assert plan["order_quantity"][0] == np.ceil(plan["order_up_to"][0])
+    assert plan["order_quantity"][2] == 0.0
+
+    # Loss-leaders (price below cost) plan for the 0.5 floor and report it
+    loss_leader = ReplenishmentOptimizer().plan(
+        forecast[:1], forecast[:1] * 0.8, forecast[:1] * 1.2, current_stock=np.array([0.0]),
+        lead_time_days=np.array([7]), unit_cost=np.array([5.0]), sale_price=np.array([4.0])
+    )
+    assert loss_leader["service_level"].tolist() == [0.5]
+
+@pytest.mark.asyncio
+async def test_replenishment_skips_untrained_and_uses_model_interval_width(monkeypatch):
+    """Test /replenishment plans only products with a model, at the model's interval coverage"""
+    import numpy as np
+    from app.api.routes import prediction
+    from app.schemas.prediction_schemas import ReplenishmentItem, ReplenishmentRequest
+
+    widths = []
+
+    class TrainedPredictor(Predictor):
+        interval_width = 0.8
+
+        def _predict_prophet(self, product_ids, forecast_days, start_date=None):
+            values = np.full((1, forecast_days), 10.0)
+            return [product_ids.index("a")], (values, values * 0.8, values * 1.2)
+
+    original_plan = prediction.optimizer.plan
+
+    def plan(*args, **kwargs):
+        widths.append(kwargs["interval_level"])
+        return original_plan(*args, **kwargs)
+
+    monkeypatch.setattr(prediction.batcher, "predictor", TrainedPredictor())
+    monkeypatch.setattr(prediction.optimizer, "plan", plan)
+    items = [ReplenishmentItem(product_id=p, current_stock=0, unit_cost=5, sale_price=8) for p in ("a", "b")]
+    response = await prediction.replenishment_plan(ReplenishmentRequest(items=items))
+
+    assert [p.product_id for p in response.plans] == ["a"]
+    assert response.untrained_product_ids == ["b"]
+    assert widths == [0.8]
+    assert response.plans[0].order_quantity > 0
@@ -3,7 +3,119 @@ from app.models.prophet_model import ProphetModel
 
 def test_prophet_model():
     """Test Prophet model"""
-    model = ProphetModel()
-    result = model.train({})
+    from app.training.synthetic_data import SyntheticSalesGenerator
+
+    model = ProphetModel(workers=1)
+    with pytest.raises(ValueError):
+        model.train({})
+    sales = next(SyntheticSalesGenerator(n_products=2, n_days=120, seed=42).iter_daily_sales())
+    result = model.train({"sales": sales})
     assert result["status"] == "trained"
+    assert sorted(model.model) == ["SYN000000", "SYN000001"]
+
+
+def test_lstm_windowed_dataset_and_runtime():
+    """Test strided windows and NumPy LSTM inference shapes"""
+    import numpy as np
+    from app.models.lstm_model import WindowedDataset, NumpyLSTMRuntime
+
+    series = np.arange(20, dtype=np.float32).reshape(2, 10)
+    series[1, 2] = np.nan
+    dataset = WindowedDataset(series, window=3)
+    assert np.shares_memory(dataset.windows, series)
+    # 7 windows for the first product, 4 gap-free windows for the second
+    assert len(dataset) == 7 + 4
+    inputs, targets = dataset.batch(dataset.index[:2])
+    assert inputs.shape == (2, 3, 1)
+    assert targets[:, 0].tolist() == [3.0, 4.0]
+
+    hidden = 4
+    rng = np.random.default_rng(0)
+    runtime = NumpyLSTMRuntime({
+        "num_layers": np.array(1),
+        "w_ih_0": rng.normal(size=(4 * hidden, 1)).astype(np.float32),
+        "w_hh_0": rng.normal(size=(4 * hidden, hidden)).astype(np.float32),
+        "b_0": np.zeros(4 * hidden, dtype=np.float32),
+        "w_out": rng.normal(size=(1, hidden)).astype(np.float32),
+        "b_out": np.zeros(1, dtype=np.float32),
+    })
+    assert runtime.forward(inputs).shape == (2, 1)
+
+def test_prophet_warm_start_json_roundtrip(tmp_path):
+    """Test Prophet refits warm-start from saved parameters and predict in a pool"""
+    import numpy as np
+    from app.training.synthetic_data import SyntheticSalesGenerator
+
+    sales = next(SyntheticSalesGenerator(n_products=3, n_days=200, seed=3).iter_daily_sales())
+    model = ProphetModel(workers=2, chunk_size=2)
+    first = model.train({"sales": sales})
+    assert first["products"] == 3
+    assert first["warm_started"] == 0
+
+    path = str(tmp_path / "prophet_model.json")
+    model.save(path)
+    restored = ProphetModel(workers=2, chunk_size=2)
+    restored.load(path)
+    # Loading (e.g. to warm-start a refit) starts no workers, and fits use a pool of their own
+    assert restored._pool is None
+    assert restored.train({"sales": sales})["warm_started"] == 3
+    assert restored._pool is None
+
+    product_ids = sorted(model.model)
+    predictions, lower, upper = restored.predict_batch(product_ids, 14)
+    assert predictions.shape == (3, 14)
+    assert np.all(lower <= predictions) and np.all(predictions <= upper)
+    # The pool persists across calls; workers keep their deserialized models
+    pool = restored._pool
+    np.testing.assert_allclose(restored.predict_batch(product_ids, 14)[0], predictions)
+    assert restored._pool is pool
+    restored.close()
+    model.close()
+
+    sampled = ProphetModel(uncertainty_samples=200, workers=1)
+    sampled.load(path)
+    assert len(sampled.predict({"product_id": product_ids[0], "forecast_days": 7})) == 7
+    assert list(sampled._cache) == [product_ids[0]]
+
+def test_prophet_zero_fills_and_forecasts_from_start_date():
+    """Test days without sales train as zeros and forecasts start at the requested date"""
+    import datetime
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    # A slow mover sells 10 units every fifth day; the export has no rows for the other days
+    sales = pd.DataFrame({"productId": "slow", "date": dates[::5], "quantity": 10.0})
+    frame = ProphetModel._training_frame({"sales": sales})
+    assert len(frame) == 56
+    assert frame["y"].sum() == 120.0
+
+    model = ProphetModel(workers=1)
+    model.train({"sales": sales})
+    start = datetime.date(2024, 4, 1)
+    predictions, _, _ = model.predict_batch(["slow"], 7, start_date=start)
+    assert predictions.shape == (1, 7)
+    assert np.all(predictions < 5)
+    # The same dates forecast from a later start are the same values, not shifted by the training end
+    later, _, _ = model.predict_batch(["slow"], 5, start_date=start + datetime.timedelta(days=2))
+    np.testing.assert_allclose(later[0], predictions[0, 2:])
+
+def test_lstm_series_matrix_from_parquet_zero_fills_gaps(tmp_path):
+    """Test a Parquet sales file becomes a daily matrix with zeros for days without sales"""
+    import numpy as np
+    import pandas as pd
+    from app.models.lstm_model import LSTMModel
+
+    path = str(tmp_path / "sales.parquet")
+    pd.DataFrame({
+        "productId": ["a", "a", "b", "a", "b"],
+        "date": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-03", "2024-01-05", "2024-01-05"]),
+        "quantity": [1.0, 2.0, 4.0, 5.0, 6.0],
+    }).to_parquet(path)
+    product_ids, matrix = LSTMModel._series_matrix({"data_path": path})
 
+    assert product_ids == ["a", "b"]
+    np.testing.assert_array_equal(matrix, np.array([
+        [3.0, 0.0, 0.0, 0.0, 5.0],
+        [np.nan, np.nan, 4.0, 0.0, 6.0],
+    ], dtype=np.float32))
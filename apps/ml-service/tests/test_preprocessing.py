@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from app.preprocessing.scaler import ScalerBank
+
+def test_scaler_bank_partial_fit_matches_full_fit():
+    """Test online updates match a single grouped fit"""
+    rng = np.random.default_rng(0)
+    groups = rng.choice(["a", "b", "c"], size=300)
+    values = rng.normal(10, 3, size=300)
+
+    online = ScalerBank().partial_fit(groups[:100], values[:100]).partial_fit(groups[100:], values[100:])
+    full = ScalerBank().fit(groups, values)
+    for group in ["a", "b", "c"]:
+        expected = values[groups == group]
+        assert online.mean[online.index[group]] == pytest.approx(expected.mean())
+        assert online.std[online.index[group]] == pytest.approx(expected.std())
+    np.testing.assert_allclose(online.transform(groups, values), full.transform(groups, values))
+    np.testing.assert_allclose(online.inverse_transform(groups, online.transform(groups, values)), values)
+
+def test_scaler_bank_matrix_fit_matches_flat_fit():
+    """Test the dense (groups x days) path matches fitting one label per value"""
+    rng = np.random.default_rng(2)
+    matrix = rng.normal(50, 10, size=(4, 30))
+    matrix[1, :10] = np.nan
+    groups = ["p0", "p1", "p2", "p3"]
+    flat_groups = np.repeat(groups, 30)
+    observed = ~np.isnan(matrix.ravel())
+
+    dense = ScalerBank().fit_matrix(groups, matrix)
+    flat = ScalerBank().fit(flat_groups[observed], matrix.ravel()[observed])
+    for name in ("count", "mean", "m2", "min", "max"):
+        np.testing.assert_allclose(getattr(dense, name), getattr(flat, name))
+    scaled = dense.transform_matrix(groups, matrix)
+    np.testing.assert_allclose(scaled.ravel()[observed], flat.transform(flat_groups[observed], matrix.ravel()[observed]))
+    np.testing.assert_allclose(dense.inverse_transform_matrix(groups, scaled), matrix)
+
+def test_streaming_anomaly_detector_flags_spike_without_shifting_baseline():
+    """Test a sales spike is flagged and winsorized out of the level"""
+    from app.preprocessing.anomaly_detector import StreamingAnomalyDetector
+
+    detector = StreamingAnomalyDetector(warmup=5)
+    rng = np.random.default_rng(1)
+    for _ in range(30):
+        detector.update(["a", "b"], rng.normal(20, 2, size=2))
+    level = detector.mean[detector.index["a"]]
+
+    scores, flags = detector.update(["a", "b"], [200.0, 20.0])
+    assert flags.tolist() == [True, False]
+    assert scores[0] > 10
+    assert detector.mean[detector.index["a"]] - level < 2.0
+    assert len(detector) == 2
+
+def test_streaming_anomaly_detector_flags_spike_after_constant_history():
+    """Test the variance floor flags a jump from a flat series"""
+    from app.preprocessing.anomaly_detector import StreamingAnomalyDetector
+
+    detector = StreamingAnomalyDetector()
+    for _ in range(20):
+        detector.update(["zero", "five"], [0.0, 5.0])
+    scores, flags = detector.update(["zero", "five", "zero"], [300.0, 500.0, 0.0])
+    assert flags.tolist() == [True, True, False]
+    assert np.isfinite(scores).all()
+    # The spike was winsorized, so the next ordinary day is not an anomaly
+    assert detector.mean[detector.index["five"]] < 10.0
+    _, flags = detector.update(["five"], [5.0])
+    assert flags.tolist() == [False]
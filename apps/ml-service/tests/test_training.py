@@ -2,9 +2,213 @@ import pytest
 from app.training.trainer import Trainer
 
 @pytest.mark.asyncio
-async def test_train_model():
+async def test_train_model(tmp_path, monkeypatch):
     """Test model training"""
+    from app.training.synthetic_data import SyntheticSalesGenerator
+
+    monkeypatch.setenv("ML_MODEL_PATH", str(tmp_path))
+    data_path = str(tmp_path / "sales.csv")
+    SyntheticSalesGenerator(n_products=2, n_days=120, seed=42).write_csv(data_path)
     trainer = Trainer()
-    result = await trainer.train_model("prophet")
+    result = await trainer.train_model("prophet", data_path=data_path)
     assert "accuracy" in result
+    assert (tmp_path / "prophet_model.json").exists()
+    # Only the model store keeps the fitted models in memory
+    assert trainer.models["prophet"].model == {}
+    with pytest.raises(ValueError, match="per-product"):
+        await trainer.train_model("lstm", data_path=data_path, product_ids=["SYN000000"])
+
+
+def test_synthetic_sales_generator():
+    """Test synthetic seasonal sales generation"""
+    from app.training.synthetic_data import SyntheticSalesGenerator
+    generator = SyntheticSalesGenerator(n_products=7, n_days=60, seed=1)
+    chunks = list(generator.iter_daily_sales(chunk_size=3))
+    assert [len(c) for c in chunks] == [180, 180, 60]
+    assert all((c["quantity"] >= 0).all() for c in chunks)
+    again = next(SyntheticSalesGenerator(n_products=7, n_days=60, seed=1).iter_daily_sales(chunk_size=3))
+    assert chunks[0]["quantity"].tolist() == again["quantity"].tolist()
+
+def test_columnar_ingestion_roundtrip(tmp_path):
+    """Test CSV to partitioned Parquet conversion with pushdown reads"""
+    import numpy as np
+    from app.training.data_loader import DataLoader
+    from app.training.synthetic_data import SyntheticSalesGenerator
+    import datetime
+
+    csv_path = str(tmp_path / "sales.csv")
+    generator = SyntheticSalesGenerator(n_products=4, n_days=90, start_date=datetime.date(2024, 1, 1))
+    generator.write_csv(csv_path)
+
+    parquet_dir = DataLoader.convert_csv_to_parquet(csv_path, str(tmp_path / "sales"))
+    df = DataLoader.load_columnar(parquet_dir)
+    assert len(df) == 4 * 90
+    assert df["productId"].dtype == "category"
+    assert df["quantity"].dtype == np.int32
+    assert df["totalAmount"].dtype == np.float32
+
+    subset = DataLoader.load_columnar(
+        parquet_dir, columns=["productId", "quantity"],
+        filters=[("month", "==", "2024-02"), ("productId", "in", ["SYN000001"])]
+    )
+    assert list(subset.columns) == ["productId", "quantity"]
+    assert len(subset) == 29
+
+@pytest.mark.asyncio
+async def test_sales_consumer_batch_updates_affected_products(tmp_path):
+    """Test a batch of sale documents refreshes only the touched products"""
+    import datetime
+    from app.training.sales_consumer import SalesChangeConsumer
+
+    consumer = SalesChangeConsumer(state_path=str(tmp_path / "state.npz"))
+    notified = []
+
+    async def listener(product_ids):
+        notified.append(product_ids)
+
+    consumer.add_listener(listener)
+    documents = [
+        {"_id": "s1", "saleDate": datetime.datetime(2024, 1, 1), "items": [
+            {"productId": "p1", "productName": "A", "quantity": 2, "unitPrice": 5.0, "totalPrice": 10.0},
+            {"productId": "p2", "productName": "B", "quantity": 1, "unitPrice": 3.0, "totalPrice": 3.0},
+        ]},
+        {"_id": "s2", "saleDate": datetime.datetime(2024, 1, 2), "items": [
+            {"productId": "p1", "productName": "A", "quantity": 4, "unitPrice": 5.0, "totalPrice": 20.0},
+        ]},
+    ]
+    products = await consumer.process_batch(documents)
+
+    assert products == ["p1", "p2"]
+    assert notified == [["p1", "p2"]]
+    assert consumer.sales_cube.summary("day", "product", "p1")["total_sales"] == 30.0
+    assert consumer.drain_refits() == ["p1", "p2"]
+    assert consumer.pending_refits == set()
+
+    # An edited sale queues a refit but is not added to the aggregates again
+    edited = dict(documents[1], items=[dict(documents[1]["items"][0], quantity=5, totalPrice=25.0)])
+    assert await consumer.process_edits([edited]) == ["p1"]
+    assert consumer.sales_cube.summary("day", "product", "p1")["total_sales"] == 30.0
+    assert consumer.drain_refits() == ["p1"]
+
+@pytest.mark.asyncio
+async def test_sales_consumer_bootstraps_retries_and_restores(tmp_path, fake_collection):
+    """Test the consumer folds history, retries transient errors, polls standalone servers and checkpoints"""
+    import asyncio
+    import datetime
+    from bson import ObjectId
+    from pymongo.errors import AutoReconnect, OperationFailure
+    from app.training.sales_consumer import SalesChangeConsumer
+
+    def sale(day, quantity):
+        return {"_id": ObjectId.from_datetime(datetime.datetime(2024, 1, day, tzinfo=datetime.timezone.utc)),
+                "saleDate": datetime.datetime(2024, 1, day),
+                "items": [{"productId": "p1", "quantity": quantity, "totalPrice": 10.0 * quantity}]}
+
+    class FakeSales(fake_collection):
+        def __init__(self, docs, errors):
+            super().__init__(docs)
+            self.errors = errors
+
+        def watch(self, *args, **kwargs):
+            raise self.errors.pop(0)
+
+    path = str(tmp_path / "state.npz")
+    collection = FakeSales([sale(1, 2), sale(2, 3)], [
+        AutoReconnect("primary stepped down"),
+        OperationFailure("$changeStream is only supported on replica sets", code=40573),
+    ])
+    consumer = SalesChangeConsumer(state_path=path, retry_delay=0.01, poll_interval=0.01)
+    consumer._collection = lambda: collection
+    consumer.start()
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if not collection.errors and consumer.bootstrapped:
+            break
+    # Retried after the transient error, then fell back to polling rather than stopping
+    assert collection.errors == [] and not consumer._task.done()
+    assert consumer.sales_cube.summary("day", "product", "p1")["total_sales"] == 50.0
+
+    collection.docs.append(dict(sale(3, 1), _id=ObjectId()))
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if consumer.watermark == collection.docs[-1]["_id"]:
+            break
+    assert consumer.sales_cube.summary("day", "product", "p1")["total_sales"] == 60.0
+    await consumer.stop()
+
+    # The checkpoint restores the cube with its position, so nothing is re-read from history
+    consumer._checkpoint(force=True)
+    restored = SalesChangeConsumer(state_path=path)
+    assert restored.bootstrapped
+    assert restored.watermark == collection.docs[-1]["_id"]
+    assert restored.sales_cube.summary("day", "product", "p1")["total_sales"] == 60.0
+
+def test_drift_monitor_stationary_nightly_runs_flag_nothing(tmp_path):
+    """Test single-day batches continue the features and stationary sales are not drift"""
+    import numpy as np
+    import pandas as pd
+    from app.training.drift_monitor import DriftMonitor
+
+    rng = np.random.default_rng(0)
+    rates = rng.uniform(0.5, 30, 20)
+    dates = pd.date_range("2024-01-01", periods=140, freq="D")
+
+    def sales(days):
+        frame = pd.DataFrame({
+            "productId": np.repeat([f"p{i}" for i in range(20)], len(days)),
+            "date": np.tile(days, 20),
+            "quantity": rng.poisson(np.repeat(rates, len(days))).astype(float),
+        })
+        # Exports have no rows for zero-sale days
+        return frame[frame["quantity"] > 0]
+
+    path = str(tmp_path / "drift.npz")
+    monitor = DriftMonitor()
+    monitor.update(monitor.build_features(sales(dates[:100])), reference=True)
+    for day in dates[100:]:
+        features = monitor.build_features(sales(dates[dates == day]))
+        # Zero-sale days missing from earlier files are filled in when the product sells again
+        assert features["date"].max() == day and not features.duplicated(["productId", "date"]).any()
+        assert features[["quantity_lag_7", "quantity_rolling_mean_7", "quantity_anomaly_score"]].notna().all().all()
+        monitor.update(features)
+        monitor.save(path)
+        monitor = DriftMonitor.load(path)
+
+    assert monitor.current[:, 0].sum() > 20 * 38
+    assert monitor.drifted_products() == []
+
+def test_drift_monitor_flags_only_shifted_products(tmp_path):
+    """Test histogram drift scores select only the shifted products for refit"""
+    import numpy as np
+    import pandas as pd
+    from app.training.drift_monitor import DriftMonitor
+
+    rng = np.random.default_rng(0)
+    products = np.repeat([f"p{i}" for i in range(6)], 120)
+    frame = pd.DataFrame({
+        "productId": products,
+        "category": np.where(np.isin(products, ["p0", "p1", "p2"]), "A", "B"),
+        "quantity": rng.poisson(20, len(products)).astype(float),
+    })
+    monitor = DriftMonitor(features=["quantity"])
+    monitor.update(frame, reference=True)
+    monitor.update_errors(frame["productId"], frame["quantity"], frame["quantity"] + rng.normal(0, 2, len(frame)),
+                          reference=True)
+
+    live = frame.assign(quantity=rng.poisson(20, len(frame)).astype(float))
+    live.loc[live["productId"] == "p0", "quantity"] *= 2
+    monitor.update(live)
+    errors = rng.normal(0, 2, len(live)) + np.where(live["productId"] == "p4", 15.0, 0.0)
+    monitor.update_errors(live["productId"], live["quantity"], live["quantity"] + errors)
+
+    assert monitor.drifted_products() == ["p0", "p4"]
+    scores = monitor.scores()
+    assert scores.loc["p0", "quantity_psi"] > scores.loc["p1", "quantity_psi"]
+    assert scores.loc["p4", "error_ratio"] > monitor.error_ratio_threshold
+    assert set(monitor.scores("category").index) == {"A", "B"}
 
+    path = str(tmp_path / "drift.npz")
+    monitor.rebaseline(["p0", "p4"])
+    monitor.save(path)
+    restored = DriftMonitor.load(path)
+    assert restored.drifted_products() == []
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Bulk Data Loader for Enterprise Sales AI
+Generates seasonal sales for N products x M days and pushes them concurrently
+through the API, or writes them to CSV/Parquet for offline benchmarks.
+
+Examples:
+    python load_bulk_data.py --products 500 --days 365 --dry-run
+    python load_bulk_data.py --products 5000 --days 730 --output parquet --path data.parquet
+    python load_bulk_data.py --products 200 --days 180 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# Add the ml-service to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'apps/ml-service'))
+
+from app.training.synthetic_data import SyntheticSalesGenerator
+from load_sample_data import API_URL, EMAIL, PASSWORD, print_success, print_error, print_info, print_warning
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate and load synthetic seasonal sales data")
+    parser.add_argument("--products", type=int, default=100, help="Number of products to generate")
+    parser.add_argument("--days", type=int, default=365, help="Number of days of sales history")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", choices=["api", "csv", "parquet"], default="api",
+                        help="Push through the API or write to a file")
+    parser.add_argument("--path", default=None, help="Output file for csv/parquet")
+    parser.add_argument("--api-url", default=API_URL, help="Base URL of the NestJS API")
+    parser.add_argument("--concurrency", type=int, default=20, help="Max in-flight HTTP requests")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Products generated per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="Generate data without any backend")
+    return parser.parse_args()
+
+def sale_payload(row, name: str, api_id: str) -> dict:
+    """Build a CreateSaleDto body for one product-day"""
+    return {
+        "items": [{
+            "productId": api_id,
+            "productName": name,
+            "quantity": int(row.quantity),
+            "unitPrice": round(float(row.unitPrice), 2),
+            "totalPrice": round(float(row.totalAmount), 2),
+        }],
+        "totalAmount": round(float(row.totalAmount), 2),
+        "saleDate": row.date.isoformat() + "Z",
+        "paymentMethod": "Cash",
+        "notes": "Promotion" if row.promotion else "",
+    }
+
+def total_demand(generator: SyntheticSalesGenerator, products, chunk_size: int) -> dict:
+    """Units each product sells over the generated history"""
+    totals = {}
+    # iter_daily_sales reseeds, so this pass sees the same quantities as the push
+    for chunk in generator.iter_daily_sales(products, chunk_size=chunk_size):
+        totals.update(chunk.groupby("productId")["quantity"].sum().to_dict())
+    return totals
+
+async def run_workers(queue: asyncio.Queue, worker, concurrency: int) -> None:
+    """Run a bounded pool of workers that drain the queue"""
+    async def loop():
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                await worker(item)
+            finally:
+                queue.task_done()
+
+    tasks = [asyncio.create_task(loop()) for _ in range(concurrency)]
+    await asyncio.gather(*tasks)
+
+async def push_to_api(args, generator: SyntheticSalesGenerator) -> None:
+    """Create products and sales through the API with bounded concurrency"""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=30.0) as client:
+        try:
+            response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        except httpx.ConnectError:
+            print_error("Cannot connect to API. Is the backend running?")
+            print_info("Use --dry-run or --output csv/parquet to generate data offline")
+            sys.exit(1)
+        if response.status_code not in (200, 201):
+            print_error(f"Login failed: {response.status_code}")
+            sys.exit(1)
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        print_success("Logged in successfully")
+
+        products = generator.generate_products()
+        # Sales decrement stock, so seed enough to cover the whole history
+        demand = total_demand(generator, products, args.chunk_size)
+        api_ids = {}
+        counters = {"ok": 0, "failed": 0}
+
+        async def create_product(row):
+            body = {
+                "name": row.name, "category": row.category, "salePrice": float(row.price),
+                "mrp": float(row.price), "costPrice": float(row.costPrice),
+                "stock": int(demand.get(row.productId, 0)) + int(row.stock),
+            }
+            try:
+                response = await client.post("/products", json=body)
+                if response.status_code == 201:
+                    api_ids[row.productId] = response.json()["_id"]
+                    return
+                print_error(f"Product {row.name} failed - {response.status_code}")
+            except Exception as e:
+                print_error(f"Product {row.name} error - {str(e)}")
+
+        queue = asyncio.Queue(maxsize=args.concurrency * 2)
+        workers = asyncio.create_task(run_workers(queue, create_product, args.concurrency))
+        for row in products.itertuples(index=False):
+            await queue.put(row)
+        for _ in range(args.concurrency):
+            await queue.put(None)
+        await workers
+        print_success(f"Created {len(api_ids)}/{len(products)} products")
+
+        names = dict(zip(products["productId"], products["name"]))
+
+        async def create_sale(body):
+            try:
+                response = await client.post("/sales", json=body)
+                counters["ok" if response.status_code == 201 else "failed"] += 1
+            except Exception:
+                counters["failed"] += 1
+
+        queue = asyncio.Queue(maxsize=args.concurrency * 2)
+        workers = asyncio.create_task(run_workers(queue, create_sale, args.concurrency))
+        start = time.perf_counter()
+        for chunk in generator.iter_daily_sales(products, chunk_size=args.chunk_size):
+            for row in chunk[chunk["quantity"] > 0].itertuples(index=False):
+                if row.productId in api_ids:
+                    await queue.put(sale_payload(row, names[row.productId], api_ids[row.productId]))
+            print_info(f"Queued chunk - {counters['ok']} sales created so far")
+        for _ in range(args.concurrency):
+            await queue.put(None)
+        await workers
+        elapsed = time.perf_counter() - start
+        rate = counters["ok"] / elapsed if elapsed else 0.0
+        print_success(f"Created {counters['ok']} sales in {elapsed:.1f}s ({rate:.0f}/s)")
+        if counters["failed"]:
+            print_warning(f"{counters['failed']} sales failed")
+
+def dry_run(args, generator: SyntheticSalesGenerator) -> None:
+    """Generate everything in memory-bounded chunks and print a summary"""
+    start = time.perf_counter()
+    rows = sales = units = 0
+    revenue = 0.0
+    for chunk in generator.iter_daily_sales(chunk_size=args.chunk_size):
+        rows += len(chunk)
+        sales += int((chunk["quantity"] > 0).sum())
+        units += int(chunk["quantity"].sum())
+        revenue += float(chunk["totalAmount"].astype("float64").sum())
+    elapsed = time.perf_counter() - start
+    print_success(f"Generated {rows} product-days in {elapsed:.2f}s")
+    print(f"  Sales documents: {sales}")
+    print(f"  Units sold: {units}")
+    print(f"  Revenue: {revenue:,.2f}")
+
+def main():
+    args = parse_args()
+    generator = SyntheticSalesGenerator(n_products=args.products, n_days=args.days, seed=args.seed)
+    print_info(f"Generating {args.products} products x {args.days} days")
+
+    if args.dry_run:
+        dry_run(args, generator)
+    elif args.output == "api":
+        asyncio.run(push_to_api(args, generator))
+    else:
+        path = args.path or f"synthetic_sales.{args.output}"
+        start = time.perf_counter()
+        if args.output == "csv":
+            result = generator.write_csv(path, chunk_size=args.chunk_size)
+        else:
+            result = generator.write_parquet(path, chunk_size=args.chunk_size)
+        print_success(f"Wrote {result['rows']} rows to {result['path']} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n")
+        print_warning("Interrupted by user")
+        sys.exit(0)
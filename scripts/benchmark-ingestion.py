@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Compare pandas CSV loading with the columnar (pyarrow) ingestion path
+"""
+
+import sys
+import os
+import time
+
+# Add the ml-service to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../apps/ml-service'))
+
+from app.training.data_loader import DataLoader
+
+def measure(label, load):
+    start = time.perf_counter()
+    df = load()
+    elapsed = time.perf_counter() - start
+    memory = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{label:<28} {elapsed:8.2f}s {memory:10.1f} MB  {len(df)} rows")
+    return elapsed, memory
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/benchmark-ingestion.py <sales.csv> [parquet_dir]")
+        sys.exit(1)
+    csv_path = sys.argv[1]
+
+    baseline = measure("pandas read_csv", lambda: DataLoader.load_from_csv(csv_path))
+    measure("pyarrow CSV + downcast", lambda: DataLoader.load_columnar(csv_path))
+
+    start = time.perf_counter()
+    parquet_dir = DataLoader.convert_csv_to_parquet(csv_path, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"{'convert to parquet (once)':<28} {time.perf_counter() - start:8.2f}s  -> {parquet_dir}")
+
+    parquet = measure("partitioned parquet", lambda: DataLoader.load_columnar(parquet_dir))
+    print(f"✅ Parquet re-read: {baseline[0] / parquet[0]:.1f}x faster, {baseline[1] / parquet[1]:.1f}x less memory")
+
+if __name__ == "__main__":
+    main()
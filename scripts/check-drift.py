@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Script to check feature and forecast-error drift and refit only drifted products.
+Run nightly on the latest sales; monitor state is kept between runs.
+"""
+
+import sys
+import os
+import argparse
+import json
+
+# Add the ml-service to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../apps/ml-service'))
+
+from app.training.data_loader import DataLoader
+from app.training.drift_monitor import DriftMonitor
+from app.training.trainer import Trainer
+import asyncio
+import pandas as pd
+
+def load_features(monitor: DriftMonitor, path: str) -> pd.DataFrame:
+    # Continues each product's lag/rolling window and anomaly detector from the previous run
+    return monitor.build_features(DataLoader.load_columnar(path))
+
+async def main():
+    model_path = os.getenv("ML_MODEL_PATH", "./saved_models")
+    parser = argparse.ArgumentParser(description="Detect drifted products and refit only those")
+    parser.add_argument("--current", required=True, help="Daily sales since the last check (CSV or Parquet)")
+    parser.add_argument("--reference", help="Training-period daily sales; needed on the first run")
+    parser.add_argument("--forecasts", help="Forecasts for the recent period (productId, date, predicted)")
+    parser.add_argument("--state", default=os.path.join(model_path, "drift_monitor.npz"), help="Monitor state file")
+    parser.add_argument("--retrain", choices=["prophet"], help="Refit drifted products with this model")
+    parser.add_argument("--train-data", help="Full training data for the refit (defaults to --current)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.state):
+        monitor = DriftMonitor.load(args.state)
+    elif args.reference:
+        monitor = DriftMonitor()
+        monitor.update(load_features(monitor, args.reference), reference=True)
+    else:
+        parser.error("--reference is required until a monitor state exists")
+
+    current = load_features(monitor, args.current)
+    monitor.update(current)
+    if args.forecasts:
+        forecasts = pd.read_csv(args.forecasts, parse_dates=["date"])
+        forecasts["productId"] = forecasts["productId"].astype(str)
+        joined = current.merge(forecasts, on=["productId", "date"])
+        # The first errors seen after a fit are the baseline for later ones
+        baseline = monitor.reference_errors[:, 0].sum() == 0
+        monitor.update_errors(joined["productId"], joined["quantity"], joined["predicted"], reference=baseline)
+
+    scores = monitor.scores()
+    drifted = monitor.drifted_products()
+    print(f"Checked {len(monitor)} products: {len(drifted)} drifted")
+    for product_id, row in scores.loc[drifted].sort_values("max_psi", ascending=False).head(10).iterrows():
+        print(f"  {product_id}: max PSI {row['max_psi']:.2f}, error ratio {row['error_ratio']:.2f}")
+    with open(os.path.join(os.path.dirname(args.state) or ".", "drift_report.json"), "w") as f:
+        json.dump({"drifted": drifted, "categories": monitor.scores("category")["drifted"].to_dict()}, f)
+
+    if args.retrain and drifted:
+        result = await Trainer().train_model(args.retrain, data_path=args.train_data or args.current,
+                                             product_ids=drifted)
+        monitor.rebaseline(drifted)
+        print(f"✅ Refit {len(drifted)} products - Accuracy: {result.get('accuracy', 0)}")
+    monitor.save(args.state)
+
+if __name__ == "__main__":
+    asyncio.run(main())
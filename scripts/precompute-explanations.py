@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Script to pre-generate LLM explanations for the top-N forecasted products.
+Run after score-forecasts.py; products whose forecast is unchanged are skipped,
+so an interrupted run can simply be restarted.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the ml-service to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../apps/ml-service'))
+
+from app.agentic_ai.explanations import ExplanationPrecomputer
+import asyncio
+
+def print_progress(stats):
+    done = stats["generated"] + stats["skipped"] + stats["failed"]
+    todo = stats["total"] - stats["missing_forecast"]
+    print(f"\r  {done}/{todo} products ({stats['generated']} generated, "
+          f"{stats['skipped']} unchanged, {stats['failed']} failed)", end="", flush=True)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Precompute forecast explanations into MongoDB")
+    parser.add_argument("--top", type=int, default=100, help="Number of best-selling products to explain")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent LLM requests")
+    args = parser.parse_args()
+
+    precomputer = ExplanationPrecomputer(concurrency=args.concurrency)
+    print(f"Explaining forecasts for the top {args.top} products...")
+    stats = await precomputer.run(top_n=args.top, progress=print_progress)
+    print()
+    if stats["missing_forecast"]:
+        print(f"⚠️  {stats['missing_forecast']} products have no stored forecast (run score-forecasts.py first)")
+    if stats["failed"]:
+        print(f"❌ {stats['failed']} explanations failed; rerun to retry them")
+    print(f"✅ {stats['generated']} explanations generated, {stats['skipped']} unchanged")
+
+if __name__ == "__main__":
+    asyncio.run(main())
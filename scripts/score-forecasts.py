@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script to precompute forecasts for the whole catalog into MongoDB.
+Run on a schedule (e.g. nightly cron) after training.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the ml-service to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../apps/ml-service'))
+
+from app.inference.batch_predictor import BatchPredictor
+from app.inference.forecast_store import ForecastStore
+from app.agentic_ai.explanations import ExplanationPrecomputer
+import asyncio
+
+async def main():
+    parser = argparse.ArgumentParser(description="Precompute catalog forecasts into MongoDB")
+    parser.add_argument("--days", type=int, default=30, help="Forecast horizon in days")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Products scored per chunk")
+    parser.add_argument("--explain-top", type=int, default=0,
+                        help="Also pre-generate LLM explanations for this many top products")
+    args = parser.parse_args()
+
+    store = ForecastStore(batch_predictor=BatchPredictor(chunk_size=args.chunk_size))
+    print(f"Scoring catalog ({args.days} days)...")
+    result = await store.run(forecast_days=args.days)
+    print(f"✅ Wrote {result['points']} forecast points for {result['products']} products (run {result['run_id']})")
+    if result["untrained"]:
+        print(f"⚠️  {result['untrained']} products have no trained model and were skipped")
+
+    if args.explain_top:
+        print(f"Explaining forecasts for the top {args.explain_top} products...")
+        stats = await ExplanationPrecomputer().run(top_n=args.explain_top)
+        print(f"✅ {stats['generated']} explanations generated, {stats['skipped']} unchanged, {stats['failed']} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
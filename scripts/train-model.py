@@ -5,6 +5,7 @@ Script to train ML models for sales forecasting
 
 import sys
 import os
+import argparse
 
 # Add the ml-service to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../apps/ml-service'))
@@ -13,10 +14,13 @@ from app.training.trainer import Trainer
 import asyncio
 
 async def main():
+    parser = argparse.ArgumentParser(description="Train the forecasting models")
+    parser.add_argument("--data", required=True, help="Daily sales to fit Prophet on (CSV or Parquet)")
+    args = parser.parse_args()
     trainer = Trainer()
     
     print("Training Prophet model...")
-    result = await trainer.train_model("prophet")
+    result = await trainer.train_model("prophet", data_path=args.data)
     print(f"✅ Prophet model trained - Accuracy: {result.get('accuracy', 0)}")
     
     print("Training XGBoost model...")